@@ -11,6 +11,7 @@ except Exception:
 from newspulse_pkg.auth import authenticate_user, register_user, is_auth_configured
 from newspulse_pkg.config import AppConfig
 from newspulse_pkg.news_ui import render_live_news_space
+from newspulse_pkg.registry import warmup_models
 
 
 def _ensure_streamlit_run():
@@ -72,6 +73,8 @@ _ensure_streamlit_run()
 
 cfg = AppConfig()
 st.set_page_config(page_title=cfg.app_title, page_icon="📰", layout="wide")
+# Optional: load the models listed in WARMUP_MODELS in the background
+warmup_models(background=True)
 
 st.markdown(
 	f"""
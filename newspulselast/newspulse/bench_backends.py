@@ -0,0 +1,106 @@
+"""Compare sentiment inference backends on accuracy, latency and memory.
+
+Each backend is loaded in a fresh subprocess so resident memory is measured
+in isolation. Accuracy is measured on the ``tweet_eval`` sentiment test split,
+and agreement is the share of predictions that match the first backend listed::
+
+	python bench_backends.py --backends torch,torch-int8,onnx --limit 1000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from newspulse_pkg.backends import BACKENDS
+from newspulse_pkg.config import AppConfig
+
+
+TWEET_EVAL_LABELS = {0: "negative", 1: "neutral", 2: "positive"}
+
+
+def _rss_mb() -> float:
+	# ru_maxrss is reported in kilobytes on Linux
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _load_tweet_eval(limit: int):
+	from datasets import load_dataset
+
+	ds = load_dataset("tweet_eval", "sentiment", split="test")
+	if limit:
+		ds = ds.select(range(min(limit, len(ds))))
+	return list(ds["text"]), [TWEET_EVAL_LABELS[int(i)] for i in ds["label"]]
+
+
+def run_one(backend: str, model_name: str, limit: int, repeats: int) -> Dict:
+	from newspulse_pkg.sentiment import get_sentiment_engine, normalize_sentiment_label
+
+	texts, gold = _load_tweet_eval(limit)
+	start = time.perf_counter()
+	engine = get_sentiment_engine(model_name, backend)
+	load_seconds = time.perf_counter() - start
+	engine.predict(texts[: engine.batch_size])  # warm-up
+	timings: List[float] = []
+	outputs: List[dict] = []
+	for _ in range(max(1, repeats)):
+		start = time.perf_counter()
+		outputs = engine.predict(texts)
+		timings.append(time.perf_counter() - start)
+	labels = [normalize_sentiment_label(o["label"], model_name) for o in outputs]
+	best = min(timings)
+	return {
+		"backend": backend,
+		"texts": len(texts),
+		"accuracy": sum(p == g for p, g in zip(labels, gold)) / max(1, len(gold)),
+		"load_seconds": load_seconds,
+		"seconds": best,
+		"ms_per_text": 1000.0 * best / max(1, len(texts)),
+		"texts_per_second": len(texts) / best if best > 0 else 0.0,
+		"rss_mb": _rss_mb(),
+		"labels": labels,
+	}
+
+
+def main(argv=None) -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--backends", default=",".join(BACKENDS))
+	parser.add_argument("--model", default=AppConfig().sentiment_model)
+	parser.add_argument("--limit", type=int, default=1000, help="number of tweet_eval test texts (0 = all)")
+	parser.add_argument("--repeats", type=int, default=3)
+	parser.add_argument("--run-one", metavar="BACKEND", help=argparse.SUPPRESS)
+	args = parser.parse_args(argv)
+
+	if args.run_one:
+		print(json.dumps(run_one(args.run_one, args.model, args.limit, args.repeats)))
+		return
+
+	results = []
+	for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+		cmd = [sys.executable, __file__, "--run-one", backend, "--model", args.model, "--limit", str(args.limit), "--repeats", str(args.repeats)]
+		proc = subprocess.run(cmd, capture_output=True, text=True)
+		if proc.returncode != 0:
+			tail = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+			print(f"{backend:<11} error: {tail}")
+			continue
+		results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+	if not results:
+		return
+
+	baseline = results[0]
+	print(f"{'backend':<11} {'accuracy':>8} {'agree':>6} {'ms/text':>8} {'texts/s':>8} {'speedup':>7} {'rss MB':>7} {'load s':>6}")
+	for r in results:
+		agree = sum(a == b for a, b in zip(r["labels"], baseline["labels"])) / max(1, r["texts"])
+		speedup = baseline["seconds"] / r["seconds"] if r["seconds"] > 0 else 0.0
+		print(
+			f"{r['backend']:<11} {r['accuracy']:>8.3f} {agree:>6.3f} {r['ms_per_text']:>8.2f} "
+			f"{r['texts_per_second']:>8.1f} {speedup:>6.2f}x {r['rss_mb']:>7.0f} {r['load_seconds']:>6.1f}"
+		)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,104 @@
+"""Import-time budget for the Streamlit entry point.
+
+Runs the imports of ``app.py`` (streamlit included) in a fresh interpreter
+under ``python -X importtime`` and counts everything the process pays
+before the login page can render, interpreter start-up included. Fails
+(exit code 1) if that exceeds the budget, or if this package pulls in any
+heavy dependency eagerly::
+
+	python check_import_time.py --budget-ms 800
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from typing import List, Set, Tuple
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENTRY_POINT = os.path.join(HERE, "app.py")
+PACKAGE = "newspulse_pkg"
+
+# Must only load on first use (model loading, analysis, charts)
+HEAVY = ["torch", "transformers", "spacy", "nltk", "pandas", "matplotlib", "seaborn", "plotly", "pymongo", "datasets", "pyarrow", "feedparser"]
+
+
+def entry_point_imports(path: str = ENTRY_POINT) -> Tuple[List[str], List[str]]:
+	"""Module-level import statements of ``path``: (third-party ones, this package's ones), in order.
+
+	Imports inside ``try`` blocks keep their handlers, so optional ones behave
+	as they do in the app.
+	"""
+	with open(path, "r", encoding="utf-8") as fh:
+		tree = ast.parse(fh.read(), path)
+	external: List[str] = []
+	own: List[str] = []
+	for node in tree.body:
+		if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+			continue
+		if isinstance(node, ast.ImportFrom) and (node.module or "").split(".")[0] == PACKAGE:
+			own.append(ast.unparse(node))
+		elif isinstance(node, (ast.Import, ast.ImportFrom)) or (
+			isinstance(node, ast.Try) and all(isinstance(n, (ast.Import, ast.ImportFrom)) for n in node.body)
+		):
+			external.append(ast.unparse(node))
+	return external, own
+
+
+def measure(external: List[str], own: List[str]) -> Tuple[float, Set[str]]:
+	"""Cumulative import time (ms) of a cold process running ``external`` then ``own``,
+	and the top-level packages ``own`` loaded on top of ``external``."""
+	code = "\n".join(external) + "\nimport sys\n_before = set(sys.modules)\n"
+	code += "\n".join(own) + "\n"
+	code += "print(','.join(sorted({n.split('.')[0] for n in set(sys.modules) - _before})))\n"
+	proc = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", code],
+		capture_output=True,
+		text=True,
+		cwd=HERE,
+		env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+	)
+	if proc.returncode != 0:
+		raise SystemExit(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+	total_us = 0
+	for line in proc.stderr.splitlines():
+		parts = line.split("|")
+		if len(parts) != 3 or not parts[1].strip().isdigit():
+			continue
+		# top-level entries only: nested ones are included in their parent's cumulative time
+		if parts[2][1:].startswith(" "):
+			continue
+		total_us += int(parts[1])
+	loaded = set(filter(None, proc.stdout.strip().split(",")))
+	return total_us / 1000.0, loaded
+
+
+def main(argv=None) -> None:
+	parser = argparse.ArgumentParser(description="Check the entry point's cold import-time budget.")
+	parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "800")))
+	parser.add_argument("--entry-point", default=ENTRY_POINT)
+	parser.add_argument("--repeat", type=int, default=3, help="cold runs to take the fastest of")
+	args = parser.parse_args(argv)
+
+	external, own = entry_point_imports(args.entry_point)
+	# Fastest of a few runs, so one noisy run on a busy machine does not fail the check
+	runs = [measure(external, own) for _ in range(max(1, args.repeat))]
+	total_ms = min(ms for ms, _ in runs)
+	loaded = set().union(*(mods for _, mods in runs))
+	failures = []
+	eager = sorted(set(HEAVY) & loaded)
+	if eager:
+		failures.append(f"heavy modules imported eagerly: {', '.join(eager)}")
+	if total_ms > args.budget_ms:
+		failures.append(f"import took {total_ms:.0f} ms, budget is {args.budget_ms:.0f} ms")
+	print(f"import {os.path.basename(args.entry_point)}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+	for msg in failures:
+		print(f"FAIL: {msg}")
+	sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,182 @@
+"""End-to-end check of the ingestion daemon against a local fake GNews server.
+
+Starts an ``http.server`` that serves ``/top-headlines`` and an RSS feed, in
+which every poll round returns one article already served in the previous
+round plus one new one. Runs ``IngestionDaemon.run_once`` against it and
+checks that new articles are appended once, that repeated URLs are skipped
+by the store's seen-set (also after reopening the store), that the UI reads
+the stored articles back, and that it treats categories the daemon stopped
+polling as stale. Exits 1 on failure::
+
+	python check_ingestion.py
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import orjson
+
+
+CATEGORIES = ["technology", "sports"]
+
+
+class FakeGNews:
+	"""Local stand-in for the GNews API (``/top-headlines``) plus one RSS feed (``/feed.xml``).
+
+	Round ``r`` (one round per ``advance()``) serves articles ``r`` and ``r + 1``
+	of every category; the URLs of the older one differ only by tracking
+	parameters, which the store must still treat as the same article.
+	"""
+
+	def __init__(self):
+		self.round = 0
+		self.requests: List[str] = []
+		fake = self
+
+		class Handler(BaseHTTPRequestHandler):
+			def do_GET(self):
+				url = urlparse(self.path)
+				fake.requests.append(url.path)
+				if url.path == "/top-headlines":
+					category = parse_qs(url.query).get("category", ["general"])[0]
+					body, ctype = orjson.dumps({"totalArticles": 2, "articles": fake.articles(category)}), "application/json"
+				elif url.path == "/feed.xml":
+					body, ctype = fake.feed().encode("utf-8"), "application/rss+xml"
+				else:
+					self.send_error(404)
+					return
+				self.send_response(200)
+				self.send_header("Content-Type", ctype)
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, *args):
+				pass
+
+		self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+		self._thread = threading.Thread(target=self.server.serve_forever, name="fake-gnews", daemon=True)
+
+	@property
+	def base_url(self) -> str:
+		host, port = self.server.server_address[:2]
+		return f"http://{host}:{port}"
+
+	def __enter__(self) -> "FakeGNews":
+		self._thread.start()
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.server.shutdown()
+		self.server.server_close()
+
+	def advance(self) -> None:
+		self.round += 1
+
+	def _ids(self) -> List[int]:
+		return [self.round, self.round + 1]
+
+	def articles(self, category: str) -> List[Dict]:
+		out = []
+		for i in self._ids():
+			query = "?utm_source=fake" if i == self.round and self.round > 1 else ""
+			out.append({
+				"title": f"{category} story {i}",
+				"description": f"Body of {category} story {i}.",
+				"url": f"https://news.example/{category}/{i}{query}",
+				"image": "",
+				"publishedAt": "2024-01-01T00:00:00Z",
+				"source": {"name": "Fake"},
+			})
+		return out
+
+	def feed(self) -> str:
+		items = "".join(
+			f"<item><title>feed story {i}</title><description>Feed body {i}.</description>"
+			f"<link>https://feed.example/{i}</link><guid>https://feed.example/{i}</guid></item>"
+			for i in self._ids()
+		)
+		return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Fake feed</title>{items}</channel></rss>'
+
+
+def _configure(base_url: str, workdir: str) -> None:
+	# AppConfig reads the environment on every instantiation
+	os.environ.update({
+		"GNEWS_API_KEY": "fake-key",
+		"GNEWS_BASE_URL": base_url,
+		"ARTICLE_STORE_PATH": os.path.join(workdir, "articles.sqlite3"),
+		"RATE_LIMIT_PATH": os.path.join(workdir, "ratelimit.sqlite3"),
+		"GNEWS_REQUESTS_PER_SECOND": "100",
+		"GNEWS_BURST": "100",
+		"GNEWS_DAILY_QUOTA": "1000",
+		# Every round must reach the fake server instead of the response cache
+		"RESPONSE_CACHE_TTL_HEADLINES": "0",
+		"RESPONSE_CACHE_STALE_TTL": "0",
+		"RESPONSE_CACHE_PATH": "",
+	})
+
+
+def run_checks() -> List[str]:
+	failures: List[str] = []
+
+	def expect(name: str, got, want) -> None:
+		if got != want:
+			failures.append(f"{name}: got {got!r}, expected {want!r}")
+
+	with tempfile.TemporaryDirectory() as workdir, FakeGNews() as fake:
+		_configure(fake.base_url, workdir)
+		from newspulse_pkg.daemon import RSS_CATEGORY, IngestionDaemon
+		from newspulse_pkg.store import ArticleStore, get_article_store
+
+		store = get_article_store()
+		feeds = [f"{fake.base_url}/feed.xml"]
+		daemon = IngestionDaemon(store, CATEGORIES, feeds, limit=10)
+
+		fake.advance()
+		first = daemon.run_once()
+		expect("first run", first, {**{c: 2 for c in CATEGORIES}, RSS_CATEGORY: 2})
+
+		fake.advance()
+		second = daemon.run_once()
+		expect("second run (one repeat URL per source)", second, {**{c: 1 for c in CATEGORIES}, RSS_CATEGORY: 1})
+		expect("store size", len(store), 3 * (len(CATEGORIES) + 1))
+		expect("GNews requests", fake.requests.count("/top-headlines"), 2 * len(CATEGORIES))
+
+		# A fresh process rebuilds the seen-set from disk; the same round adds nothing
+		reader = ArticleStore(store.path)
+		expect("a reader does not load the seen-set", reader._seen, None)
+		reopened = IngestionDaemon(reader, CATEGORIES, feeds, limit=10)
+		third = reopened.run_once()
+		expect("rerun after reopening the store", third, {**{c: 0 for c in CATEGORIES}, RSS_CATEGORY: 0})
+
+		from newspulse_pkg.news_ui import _load_from_store
+
+		shown = _load_from_store(CATEGORIES)
+		for cat in CATEGORIES:
+			titles = sorted(a.title for a in shown.get(cat, []))
+			expect(f"UI articles for {cat}", titles, [f"{cat} story {i}" for i in (1, 2, 3)])
+		expect("fresh categories", sorted(_load_from_store(CATEGORIES, max_age=60)), sorted(CATEGORIES))
+		# The daemon stops: its last poll ages past the limit and Fetch must go live again
+		with sqlite3.connect(store.path) as conn:
+			conn.execute("UPDATE polls SET polled_at = polled_at - 120")
+		expect("stale categories", _load_from_store(CATEGORIES, max_age=60), {})
+	return failures
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+	failures = run_checks()
+	for msg in failures:
+		print(f"FAIL: {msg}")
+	print("ingestion check " + ("failed" if failures else "passed"))
+	sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,130 @@
+"""End-to-end check of the ``onnx`` inference backend.
+
+Builds two tiny randomly initialised BERT checkpoints (token and sequence
+classification) with a local WordPiece tokenizer. BERT exports take
+``token_type_ids`` as a graph input, like the default dslim/bert-base-NER.
+It then runs them on the ``onnx`` backend through the public entry points
+(export, int8 quantization, the batched engines, ``extract_entities_hf``
+and ``predict_document_sentiment``) and compares the probabilities with
+the ``torch`` backend. Needs ``pip install 'optimum[onnxruntime]'``; exits 1
+on failure::
+
+	python check_onnx_backend.py
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+
+
+WORDS = "acme corp rose in paris after the market opened and investors cheered new results from london".split()
+TEXTS = [
+	"Acme Corp rose in Paris after the market opened",
+	"investors cheered new results from London and the market rose",
+	" ".join(WORDS * 12),
+]
+NER_LABELS = ["O", "B-ORG", "I-ORG", "B-LOC", "I-LOC", "B-PER", "I-PER"]
+SENTIMENT_LABELS = ["negative", "neutral", "positive"]
+# Mean absolute difference allowed between int8 ONNX and fp32 torch probabilities
+TOLERANCE = 0.05
+
+
+def _build_models(workdir: str) -> tuple:
+	import torch
+	from transformers import BertConfig, BertForSequenceClassification, BertForTokenClassification, BertTokenizerFast
+
+	vocab = os.path.join(workdir, "vocab.txt")
+	with open(vocab, "w", encoding="utf-8") as fh:
+		fh.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS) + "\n")
+	tokenizer = BertTokenizerFast(vocab_file=vocab, do_lower_case=True)
+	small = dict(vocab_size=len(tokenizer), hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64, max_position_embeddings=128)
+	torch.manual_seed(0)
+	paths = []
+	for name, cls, labels in (
+		("ner", BertForTokenClassification, NER_LABELS),
+		("sentiment", BertForSequenceClassification, SENTIMENT_LABELS),
+	):
+		config = BertConfig(**small, id2label=dict(enumerate(labels)), label2id={l: i for i, l in enumerate(labels)})
+		path = os.path.join(workdir, name)
+		cls(config).save_pretrained(path)
+		tokenizer.save_pretrained(path)
+		paths.append(path)
+	return tuple(paths)
+
+
+def _configure(workdir: str, ner_path: str, sentiment_path: str) -> None:
+	# AppConfig reads the environment on every instantiation
+	os.environ.update({
+		"NER_HF_MODEL": ner_path,
+		"NER_BACKEND": "onnx",
+		"NER_MAX_LENGTH": "32",
+		"NER_STRIDE": "8",
+		"SENTIMENT_MODEL": sentiment_path,
+		"SENTIMENT_BACKEND": "onnx",
+		"SENTIMENT_MAX_LENGTH": "32",
+		"SENTIMENT_WINDOW_STRIDE": "8",
+		"ONNX_CACHE_DIR": os.path.join(workdir, "onnx"),
+		"MODEL_BUNDLE_DIR": os.path.join(workdir, "bundle"),
+		"ANALYSIS_CACHE_PATH": "",
+	})
+
+
+def run_checks() -> List[str]:
+	failures: List[str] = []
+
+	def expect(name: str, ok: bool, detail: str = "") -> None:
+		if not ok:
+			failures.append(f"{name}{': ' + detail if detail else ''}")
+
+	with tempfile.TemporaryDirectory() as workdir:
+		ner_path, sentiment_path = _build_models(workdir)
+		_configure(workdir, ner_path, sentiment_path)
+		from newspulse_pkg.backends import load_sequence_classifier, load_token_classifier
+		from newspulse_pkg.inference import SequenceClassifierEngine, TokenClassifierEngine
+		from newspulse_pkg.ner import extract_entities_hf
+		from newspulse_pkg.sentiment import predict_document_sentiment
+
+		onnx_model, tokenizer = load_token_classifier(ner_path, "onnx")
+		expect("NER export keeps token_type_ids as an input", "token_type_ids" in onnx_model.input_names, str(sorted(onnx_model.input_names)))
+		ids = tokenizer(TEXTS, truncation=True, max_length=32)["input_ids"]
+		got = TokenClassifierEngine(onnx_model, tokenizer, batch_size=2).predict_token_proba_ids(ids)
+		torch_model, _ = load_token_classifier(ner_path, "torch")
+		want = TokenClassifierEngine(torch_model, tokenizer, batch_size=2).predict_token_proba_ids(ids)
+		diff = max(float(np.abs(g - w).mean()) for g, w in zip(got, want))
+		expect("NER probabilities match torch", diff < TOLERANCE, f"mean abs diff {diff:.4f}")
+
+		onnx_model, tokenizer = load_sequence_classifier(sentiment_path, "onnx")
+		got = SequenceClassifierEngine(onnx_model, tokenizer, max_length=32).predict_proba(TEXTS)
+		torch_model, _ = load_sequence_classifier(sentiment_path, "torch")
+		want = SequenceClassifierEngine(torch_model, tokenizer, max_length=32).predict_proba(TEXTS)
+		diff = float(np.abs(got - want).mean())
+		expect("sentiment probabilities match torch", diff < TOLERANCE, f"mean abs diff {diff:.4f}")
+
+		# The app's entry points, including windowing over the long text
+		entities = extract_entities_hf(TEXTS)
+		expect("extract_entities_hf returns one list per text", len(entities) == len(TEXTS))
+		docs = predict_document_sentiment(TEXTS)
+		expect("predict_document_sentiment scores every text", [d["label"] in SENTIMENT_LABELS for d in docs] == [True] * len(TEXTS))
+		expect("long text is split into windows", len(docs[-1]["windows"]) > 1, str(len(docs[-1]["windows"])))
+	return failures
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+	try:
+		import optimum.onnxruntime  # noqa: F401
+	except ImportError:
+		print("onnx backend check needs optimum and onnxruntime: pip install 'optimum[onnxruntime]'")
+		sys.exit(1)
+	failures = run_checks()
+	for msg in failures:
+		print(f"FAIL: {msg}")
+	print("onnx backend check " + ("failed" if failures else "passed"))
+	sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+	main()
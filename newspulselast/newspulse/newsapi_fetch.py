@@ -1,14 +1,17 @@
 import sys
-from typing import List, Dict
+from typing import List
 
 import requests
 
+from newspulse_pkg.articles import Article, decode_payload, iter_newsapi_articles
+from newspulse_pkg.http_client import conditional_get
+
 
 # Replace this with your actual NewsAPI key
 API_KEY = "your_api_key_here"
 
 
-def fetch_latest_articles(api_key: str, keyword: str, max_results: int = 10) -> List[Dict]:
+def fetch_latest_articles(api_key: str, keyword: str, max_results: int = 10) -> List[Article]:
     """Fetch the latest news articles matching the keyword from NewsAPI.
 
     Args:
@@ -17,7 +20,7 @@ def fetch_latest_articles(api_key: str, keyword: str, max_results: int = 10) ->
         max_results: Maximum number of articles to fetch (default 10).
 
     Returns:
-        A list of article dictionaries (possibly empty if no results).
+        A list of normalized ``Article`` records (possibly empty if no results).
 
     Raises:
         RuntimeError: For API-level errors (e.g., invalid key, rate limit).
@@ -32,13 +35,13 @@ def fetch_latest_articles(api_key: str, keyword: str, max_results: int = 10) ->
     headers = {"X-Api-Key": api_key}
 
     try:
-        response = requests.get(endpoint, params=params, headers=headers, timeout=15)
+        response = conditional_get(endpoint, params, headers=headers, timeout=15)
     except requests.exceptions.RequestException as exc:
         raise RuntimeError(f"Network error while contacting NewsAPI: {exc}") from exc
 
     # Parse response
     try:
-        payload = response.json()
+        payload = decode_payload(response.content)
     except ValueError as exc:
         raise RuntimeError("Failed to parse NewsAPI response as JSON") from exc
 
@@ -54,23 +57,22 @@ def fetch_latest_articles(api_key: str, keyword: str, max_results: int = 10) ->
             raise RuntimeError("Rate limit error: " + message)
         raise RuntimeError(f"NewsAPI error: {message}")
 
-    articles = payload.get("articles", [])
-    if not isinstance(articles, list):
-        raise RuntimeError("Unexpected response format from NewsAPI: 'articles' is not a list")
-
-    return articles
+    try:
+        return list(iter_newsapi_articles(payload))
+    except ValueError as exc:
+        raise RuntimeError(f"Unexpected response format from NewsAPI: {exc}") from exc
 
 
-def print_articles(articles: List[Dict]) -> None:
+def print_articles(articles: List[Article]) -> None:
     """Print articles in a clean format: title, source, URL."""
     if not articles:
         print("No articles found for the given keyword.")
         return
 
     for idx, article in enumerate(articles, start=1):
-        title = article.get("title") or "(No title)"
-        source = (article.get("source") or {}).get("name") or "(Unknown source)"
-        url = article.get("url") or "(No URL)"
+        title = article.title or "(No title)"
+        source = article.source or "(Unknown source)"
+        url = article.url or "(No URL)"
         print(f"{idx}. {title}\n   Source: {source}\n   URL: {url}\n")
 
 
@@ -1,3 +1,5 @@
+import importlib
+
 __all__ = [
 	"config",
 	"auth",
@@ -9,3 +11,15 @@ __all__ = [
 	"utils",
 ]
 
+
+def __getattr__(name):
+	# PEP 562: submodules (and their heavy dependencies) load on first attribute access
+	if name in __all__:
+		module = importlib.import_module(f".{name}", __name__)
+		globals()[name] = module
+		return module
+	raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+	return sorted(set(globals()) | set(__all__))
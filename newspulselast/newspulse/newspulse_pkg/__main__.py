@@ -0,0 +1,33 @@
+"""Command line entry point: ``python -m newspulse_pkg <command> [options]``.
+
+Commands:
+	prefetch  download the configured models into the offline bundle (see ``bundle``)
+	ingest    poll news sources into the local article store (see ``daemon``)
+	analyze   stream a .txt/.csv file through the analysis stages (see ``aggregate``)
+	ag-news   snapshot AG News to local Parquet for offline load tests (see ``ingestion``)
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import Optional, Sequence
+
+
+COMMANDS = {
+	"prefetch": "newspulse_pkg.bundle",
+	"ingest": "newspulse_pkg.daemon",
+	"analyze": "newspulse_pkg.aggregate",
+	"ag-news": "newspulse_pkg.ingestion",
+}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+	argv = list(sys.argv[1:] if argv is None else argv)
+	if not argv or argv[0] not in COMMANDS:
+		print(__doc__.strip())
+		raise SystemExit(0 if argv and argv[0] in ("-h", "--help") else 2)
+	importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sys
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .analysis import analyze_texts
+from .config import AppConfig
+from .corpus import TokenCorpus
+from .ngrams import Vocabulary
+from .result_cache import PIPELINE_VERSION
+from .sentiment import predict_document_sentiment
+from .store import article_key
+
+if TYPE_CHECKING:
+	import pandas as pd
+
+
+# Below this many interned tokens the aggregator never compacts its vocabulary
+_VOCAB_COMPACT_MIN = 4096
+
+
+def article_text(article) -> str:
+	return article.get("content") or article.get("description") or article.get("title") or ""
+
+
+def _text_digest(text: str) -> bytes:
+	return hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"), digest_size=8).digest()
+
+
+def _bigram_codes(ids: np.ndarray) -> List[int]:
+	"""Adjacent id pairs of one document packed into int64 codes, skipping break tokens (-1)."""
+	if ids.size < 2:
+		return []
+	# Vocabulary ids are < 2**31, so a pair packs into one int64
+	pairs = ids[:-1].astype(np.int64) << 32 | ids[1:]
+	return pairs[(ids[:-1] >= 0) & (ids[1:] >= 0)].tolist()
+
+
+def _add(total: Counter, delta: Iterable, sign: int) -> None:
+	# Unlike ``Counter -=`` this touches only the keys in ``delta``
+	for k in delta:
+		left = total[k] + sign
+		if left > 0:
+			total[k] = left
+		else:
+			del total[k]
+
+
+class _RunningCounts:
+	"""Token, bigram, entity and sentiment counts keyed by vocabulary id.
+
+	Tokens are counted in an id-indexed int64 array and bigrams as packed id
+	pairs, so folding a document in or out costs only its own length.
+	"""
+
+	def __init__(self):
+		self.vocab = Vocabulary()
+		self._token_counts = np.zeros(0, dtype=np.int64)
+		self.bigrams: Counter = Counter()
+		self.entities: Counter = Counter()
+		self.sentiments: Counter = Counter()
+
+	def _count(self, ids: np.ndarray, entities: Iterable[Tuple[str, str]], label: str, sign: int) -> None:
+		if self._token_counts.size < len(self.vocab):
+			grown = np.zeros(max(len(self.vocab), 2 * self._token_counts.size), dtype=np.int64)
+			grown[: self._token_counts.size] = self._token_counts
+			self._token_counts = grown
+		np.add.at(self._token_counts, ids[ids >= 0], sign)
+		_add(self.bigrams, _bigram_codes(ids), sign)
+		_add(self.entities, entities, sign)
+		_add(self.sentiments, [label], sign)
+
+	def top_tokens(self, top_k: int = 25) -> List[Tuple[str, int]]:
+		counts = self._token_counts[: len(self.vocab)]
+		# Stable on ids, which are in first-seen order, like ``Counter.most_common``
+		order = np.argsort(-counts, kind="stable")[:top_k]
+		return [(self.vocab.token(int(i)), int(counts[i])) for i in order if counts[i] > 0]
+
+	def top_bigrams(self, top_k: int = 20) -> List[Tuple[str, int]]:
+		token = self.vocab.token
+		return [(f"{token(code >> 32)} {token(code & 0xFFFFFFFF)}", n) for code, n in self.bigrams.most_common(top_k)]
+
+
+class ArticleContribution:
+	"""One analyzed article, stored compactly.
+
+	Tokens are int32 ids into the aggregator's shared ``Vocabulary``, entities
+	are ``(label, text, start, end)`` tuples and sentiment a ``(label, score)``
+	pair.
+	"""
+
+	__slots__ = ("digest", "token_ids", "entities", "sentiment")
+
+	def __init__(self, digest: bytes, token_ids: np.ndarray, entities: Iterable[Dict], sentiment: Dict):
+		self.digest = digest
+		self.token_ids = token_ids
+		self.entities = tuple(
+			(sys.intern(str(e.get("label") or "")), e.get("text") or "", e.get("start"), e.get("end")) for e in entities
+		)
+		self.sentiment = (sys.intern(str(sentiment.get("label", ""))), float(sentiment.get("score", 0.0)))
+
+	def entity_keys(self) -> List[Tuple[str, str]]:
+		return [(label, text) for label, text, _, _ in self.entities]
+
+	def entity_dicts(self) -> List[Dict]:
+		return [{"text": text, "label": label, "start": start, "end": end} for label, text, start, end in self.entities]
+
+	def sentiment_dict(self) -> Dict:
+		return {"label": self.sentiment[0], "score": self.sentiment[1]}
+
+
+class IncrementalAggregator(_RunningCounts):
+	"""Running overall analysis of a changing set of articles.
+
+	Articles are keyed by ``article_key`` (normalized URL). ``update`` analyzes
+	only articles it has not seen, or whose text changed, and adds or
+	subtracts each changed article's counts, so the cost of a refresh scales
+	with the size of the change rather than the size of the batch. Once most
+	of the vocabulary belongs to removed articles it is compacted.
+	"""
+
+	def __init__(self):
+		super().__init__()
+		self._contributions: Dict[int, ArticleContribution] = {}
+		self._order: List[int] = []
+
+	def __len__(self) -> int:
+		return len(self._order)
+
+	def __contains__(self, key: int) -> bool:
+		return key in self._contributions
+
+	def _apply(self, c: ArticleContribution, sign: int) -> None:
+		self._count(c.token_ids, c.entity_keys(), c.sentiment[0], sign)
+
+	def update(self, articles: Iterable) -> Tuple[int, int]:
+		"""Make the totals reflect exactly ``articles``; return (added, removed) counts."""
+		wanted: Dict[int, Tuple[bytes, str]] = {}
+		for a in articles:
+			text = article_text(a)
+			if text:
+				wanted.setdefault(article_key(a), (_text_digest(text), text))
+
+		stale = [k for k, c in self._contributions.items() if k not in wanted or wanted[k][0] != c.digest]
+		for key in stale:
+			self._apply(self._contributions.pop(key), -1)
+
+		new_keys = [k for k in wanted if k not in self._contributions]
+		if new_keys:
+			texts = [wanted[k][1] for k in new_keys]
+			docs = analyze_texts(texts)
+			sentiments = predict_document_sentiment([d.clean or d.raw for d in docs])
+			for key, doc, sent in zip(new_keys, docs, sentiments):
+				c = ArticleContribution(wanted[key][0], self.vocab.encode(doc.tokens), doc.entities, sent)
+				self._contributions[key] = c
+				self._apply(c, +1)
+		self._order = list(wanted)
+		if stale:
+			self._maybe_compact()
+		return len(new_keys), len(stale)
+
+	def _maybe_compact(self) -> None:
+		"""Drop tokens no current article uses once they are most of the vocabulary."""
+		live = np.flatnonzero(self._token_counts[: len(self.vocab)] > 0)
+		if len(self.vocab) < _VOCAB_COMPACT_MIN or live.size * 2 > len(self.vocab):
+			return
+		remap = np.full(len(self.vocab) + 1, -1, dtype=np.int32)
+		remap[live] = np.arange(live.size, dtype=np.int32)
+		# remap[-1] is the spare slot, so break tokens (-1) stay -1
+		for c in self._contributions.values():
+			c.token_ids = remap[c.token_ids]
+		self.bigrams = Counter({int(remap[code >> 32]) << 32 | int(remap[code & 0xFFFFFFFF]): n for code, n in self.bigrams.items()})
+		self._token_counts = self._token_counts[live]
+		self.vocab = Vocabulary(self.vocab.token(int(i)) for i in live)
+
+	def corpus(self) -> TokenCorpus:
+		"""Token ids of the current articles, in article order, over the shared vocabulary."""
+		contributions = [self._contributions[k] for k in self._order]
+		offsets = np.zeros(len(contributions) + 1, dtype=np.int64)
+		np.cumsum([c.token_ids.size for c in contributions], out=offsets[1:])
+		ids = np.concatenate([c.token_ids for c in contributions]) if contributions else np.zeros(0, dtype=np.int32)
+		return TokenCorpus(self.vocab.tokens(), ids, offsets)
+
+	def sentiment_list(self) -> List[Dict]:
+		"""Per-article sentiment results, in article order."""
+		return [self._contributions[k].sentiment_dict() for k in self._order]
+
+	def entity_lists(self) -> List[List[Dict]]:
+		return [self._contributions[k].entity_dicts() for k in self._order]
+
+	def get(self, key: int) -> Optional[ArticleContribution]:
+		return self._contributions.get(key)
+
+	def snapshot(self, version: str, top_k: int = 25, top_bigrams: int = 20) -> "OverallAnalysis":
+		return OverallAnalysis(
+			version=version,
+			article_count=len(self._order),
+			frequencies=tuple(self.top_tokens(top_k)),
+			bigrams=tuple(self.top_bigrams(top_bigrams)),
+			sentiment_counts=tuple(self.sentiments.most_common()),
+			entity_counts=tuple((label, text, n) for (label, text), n in self.entities.most_common()),
+		)
+
+
+class StreamingTotals(_RunningCounts):
+	"""Running token, bigram, entity and sentiment counts over a stream of text batches.
+
+	Unlike ``IncrementalAggregator`` nothing is kept per document, so memory
+	grows with the vocabulary rather than with the number of documents.
+	"""
+
+	def __init__(self):
+		super().__init__()
+		self.documents = 0
+
+	def add(self, texts: List[str]) -> int:
+		"""Analyze one batch and fold it into the totals; returns the batch size."""
+		docs = analyze_texts(texts)
+		if not docs:
+			return 0
+		sentiments = predict_document_sentiment([d.clean or d.raw for d in docs])
+		for doc, sent in zip(docs, sentiments):
+			entities = [(e.get("label"), e.get("text")) for e in doc.entities]
+			self._count(self.vocab.encode(doc.tokens), entities, sent.get("label"), +1)
+		self.documents += len(docs)
+		return len(docs)
+
+
+def analyze_file(
+	file_path: str,
+	batch_size: int = 1000,
+	text_column: Optional[str] = None,
+	use_mmap: bool = False,
+	totals: Optional[StreamingTotals] = None,
+) -> StreamingTotals:
+	"""Analyze a .txt/.csv file batch by batch with flat memory (see ``ingestion.iter_file_batches``)."""
+	from .ingestion import iter_file_batches
+
+	totals = totals if totals is not None else StreamingTotals()
+	for texts in iter_file_batches(file_path, batch_size=batch_size, text_column=text_column, use_mmap=use_mmap):
+		totals.add(texts)
+	return totals
+
+
+@dataclass(frozen=True)
+class OverallAnalysis:
+	"""Immutable overall analysis of one article batch.
+
+	``version`` is the batch fingerprint, so two results with the same version
+	describe the same articles analyzed by the same models. Instances are
+	shared between sessions. Only totals are kept, read straight off the
+	aggregator's running counts.
+	"""
+
+	version: str
+	article_count: int
+	frequencies: Tuple[Tuple[str, int], ...]
+	bigrams: Tuple[Tuple[str, int], ...]
+	sentiment_counts: Tuple[Tuple[str, int], ...]
+	# (label, entity text, mentions), most frequent first
+	entity_counts: Tuple[Tuple[str, str, int], ...]
+
+	def entity_label_counts(self) -> List[Tuple[str, int]]:
+		labels: Counter = Counter()
+		for label, _, n in self.entity_counts:
+			labels[label] += n
+		return labels.most_common()
+
+	def entity_table(self) -> pd.DataFrame:
+		"""Mentions per (label, entity), same shape as ``viz.entities_count_table``."""
+		import pandas as pd
+
+		return pd.DataFrame(list(self.entity_counts), columns=["label", "entity", "count"])
+
+def batch_fingerprint(articles: Iterable) -> str:
+	"""Order-independent hash of the batch's article keys and texts plus the models used."""
+	cfg = AppConfig()
+	entries = sorted(
+		{(article_key(a), _text_digest(text)) for a in articles for text in [article_text(a)] if text}
+	)
+	h = hashlib.blake2b(digest_size=16)
+	# Every setting that changes a per-article result, as in the cache keys of those stages
+	parts = (
+		PIPELINE_VERSION,
+		cfg.spacy_model,
+		cfg.sentiment_model,
+		cfg.sentiment_backend,
+		cfg.sentiment_doc_weighting,
+		cfg.sentiment_max_length,
+		cfg.sentiment_window_stride,
+		cfg.ner_hf_model,
+		cfg.ner_backend,
+		cfg.ner_max_length,
+		cfg.ner_stride,
+	)
+	for part in parts:
+		h.update(str(part).encode("utf-8"))
+		h.update(b"\0")
+	for key, digest in entries:
+		h.update(key.to_bytes(8, "big", signed=True))
+		h.update(digest)
+	return h.hexdigest()
+
+
+_OVERALL: "OrderedDict[str, OverallAnalysis]" = OrderedDict()
+_OVERALL_LOCK = threading.Lock()
+_OVERALL_MAX = 16
+
+
+def overall_analysis(articles: Iterable, aggregator: Optional[IncrementalAggregator] = None) -> OverallAnalysis:
+	"""The ``OverallAnalysis`` for ``articles``, computed at most once per batch per process.
+
+	Results are kept in a small process-wide LRU keyed by batch fingerprint, so
+	every session looking at the same batch reuses one result. On a miss the
+	given session ``aggregator`` is brought up to date incrementally.
+	"""
+	articles = list(articles)
+	version = batch_fingerprint(articles)
+	with _OVERALL_LOCK:
+		found = _OVERALL.get(version)
+		if found is not None:
+			_OVERALL.move_to_end(version)
+			return found
+	aggregator = aggregator if aggregator is not None else IncrementalAggregator()
+	aggregator.update(articles)
+	result = aggregator.snapshot(version)
+	with _OVERALL_LOCK:
+		_OVERALL[version] = result
+		while len(_OVERALL) > _OVERALL_MAX:
+			_OVERALL.popitem(last=False)
+	return result
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+	parser = argparse.ArgumentParser(description="Analyze a large .txt/.csv corpus in streaming batches.")
+	parser.add_argument("file")
+	parser.add_argument("--text-column", default=None)
+	parser.add_argument("--batch-size", type=int, default=1000)
+	parser.add_argument("--mmap", action="store_true", help="memory-map plain-text files")
+	parser.add_argument("--top-k", type=int, default=20)
+	args = parser.parse_args(argv)
+
+	totals = analyze_file(args.file, batch_size=args.batch_size, text_column=args.text_column, use_mmap=args.mmap)
+	print(f"documents: {totals.documents}")
+	print("sentiment: " + ", ".join(f"{label} {n}" for label, n in totals.sentiments.most_common()))
+	print("top tokens: " + ", ".join(f"{t} {n}" for t, n in totals.top_tokens(args.top_k)))
+	print("top bigrams: " + ", ".join(f"{t} {n}" for t, n in totals.top_bigrams(args.top_k)))
+	print("top entities: " + ", ".join(f"{text} ({label}) {n}" for (label, text), n in totals.entities.most_common(args.top_k)))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .config import AppConfig
+from .preprocessing import lemmas_from_doc, load_spacy_model
+from .result_cache import cached_map
+
+
+ENTITY_LABELS = frozenset({"PERSON", "ORG", "GPE", "LOC"})
+
+# Texts pulled from the input per cache lookup / nlp.pipe call
+_CHUNK_SIZE = 4096
+
+
+class DocAnalysis:
+	"""Everything the spaCy stage produces for one text, from a single parse."""
+
+	__slots__ = ("raw", "clean", "tokens", "entities")
+
+	def __init__(self, raw, clean: str, tokens: List[str], entities: List[Dict]):
+		self.raw = raw
+		self.clean = clean
+		self.tokens = tokens
+		self.entities = entities
+
+	def as_preprocessed(self) -> Dict:
+		return {"raw": self.raw, "clean": self.clean, "tokens": self.tokens}
+
+
+def entities_from_doc(doc) -> List[Dict]:
+	return [
+		{"text": ent.text, "label": ent.label_, "start": ent.start_char, "end": ent.end_char}
+		for ent in doc.ents
+		if ent.label_ in ENTITY_LABELS
+	]
+
+
+def _resolve_n_process(n_process: Optional[int], num_texts: int, cutoff: int) -> int:
+	if num_texts < cutoff:
+		# Worker start-up and model pickling cost more than they save on small batches
+		return 1
+	if n_process is None or n_process <= 0:
+		return max(1, os.cpu_count() or 1)
+	return n_process
+
+
+def analyze_texts(
+	texts: Iterable[str],
+	batch_size: Optional[int] = None,
+	n_process: Optional[int] = None,
+) -> List[DocAnalysis]:
+	"""Parse each text once and return cleaned text, lemmas and entities together.
+
+	``preprocess_texts`` and ``extract_entities_spacy`` are views over this, so
+	callers that need both should call it directly instead of parsing twice.
+	Texts go through ``nlp.pipe`` in input order; ``texts`` may be a generator.
+	Inputs smaller than ``SPACY_MULTIPROCESS_MIN_DOCS`` stay in-process, larger
+	ones fan out over ``n_process`` workers (default ``SPACY_N_PROCESS``, ``<= 0``
+	for all cores).
+	"""
+	return list(iter_analyze_texts(texts, batch_size=batch_size, n_process=n_process))
+
+
+def _parse(texts: List[str], batch_size: int, n_process: Optional[int], cutoff: int) -> List[Dict]:
+	workers = _resolve_n_process(n_process, len(texts), cutoff)
+	nlp = load_spacy_model()
+	results: List[Dict] = []
+	stream = (t if t.strip() else "" for t in texts)
+	for doc in nlp.pipe(stream, batch_size=batch_size, n_process=workers):
+		lemmas = lemmas_from_doc(doc) if len(doc) else []
+		results.append({
+			"clean": " ".join(lemmas),
+			"tokens": lemmas,
+			"entities": entities_from_doc(doc) if len(doc) else [],
+		})
+	return results
+
+
+def iter_analyze_texts(
+	texts: Iterable[str],
+	batch_size: Optional[int] = None,
+	n_process: Optional[int] = None,
+) -> Iterator[DocAnalysis]:
+	cfg = AppConfig()
+	batch_size = max(1, batch_size or cfg.spacy_batch_size)
+	cutoff = max(1, cfg.spacy_multiprocess_min_docs)
+	n_process = cfg.spacy_n_process if n_process is None else n_process
+	model = f"{cfg.spacy_model}-parser-textcat"
+	chunk_size = max(cutoff, _CHUNK_SIZE)
+	items = iter(texts)
+	while True:
+		chunk = list(islice(items, chunk_size))
+		if not chunk:
+			return
+		strings = [t if isinstance(t, str) else str(t) for t in chunk]
+		# Only cache misses are parsed, as one nlp.pipe batch per chunk
+		values = cached_map("spacy", model, strings, lambda misses: _parse(misses, batch_size, n_process, cutoff))
+		for raw, v in zip(chunk, values):
+			yield DocAnalysis(raw, v["clean"], v["tokens"], v["entities"])
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, Mapping, Optional, Union
+
+import orjson
+
+
+Payload = Union[bytes, bytearray, memoryview, str, Mapping[str, Any]]
+
+
+class Article:
+	"""Compact, provider-independent article record.
+
+	Uses ``__slots__`` instead of a per-article dict. ``get``/``[]``/``keys``
+	keep it usable wherever the old 7-key article dicts were expected
+	(``article.get("content")``, ``dict(article)``).
+	"""
+
+	__slots__ = ("id", "title", "description", "image", "url", "source", "content", "published_at")
+
+	def __init__(
+		self,
+		id: str,
+		title: str,
+		description: str,
+		image: str,
+		url: str,
+		source: str,
+		content: str,
+		published_at: str = "",
+	):
+		self.id = id
+		self.title = title
+		self.description = description
+		self.image = image
+		self.url = url
+		self.source = source
+		self.content = content
+		self.published_at = published_at
+
+	def keys(self):
+		return self.__slots__
+
+	def get(self, key: str, default: Any = None) -> Any:
+		if key in self.__slots__:
+			return getattr(self, key)
+		return default
+
+	def __getitem__(self, key: str) -> Any:
+		if key not in self.__slots__:
+			raise KeyError(key)
+		return getattr(self, key)
+
+	def __contains__(self, key: object) -> bool:
+		return key in self.__slots__
+
+	def __eq__(self, other: object) -> bool:
+		if not isinstance(other, Article):
+			return NotImplemented
+		return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+	def __hash__(self) -> int:
+		return hash(self.id)
+
+	def __repr__(self) -> str:
+		return f"Article(id={self.id!r}, title={self.title!r}, source={self.source!r})"
+
+	def __getstate__(self):
+		return tuple(getattr(self, f) for f in self.__slots__)
+
+	def __setstate__(self, state):
+		for f, v in zip(self.__slots__, state):
+			setattr(self, f, v)
+
+	def to_dict(self) -> Dict[str, str]:
+		return {f: getattr(self, f) for f in self.__slots__}
+
+	@classmethod
+	def from_dict(cls, data: Mapping[str, Any]) -> "Article":
+		return cls(*((data.get(f) or "") for f in cls.__slots__))
+
+
+def _text(value: Any) -> str:
+	return value.strip() if isinstance(value, str) else ""
+
+
+def make_article(
+	title: Any,
+	description: Any,
+	url: Any = "",
+	image: Any = "",
+	source: Any = "",
+	published_at: Any = "",
+) -> Optional[Article]:
+	"""Normalize raw provider fields into an ``Article``; ``None`` if it has no text."""
+	title = _text(title)
+	description = _text(description)
+	if not title and not description:
+		return None
+	url = _text(url)
+	content = ". ".join([p for p in [title, description] if p]).strip(". ")
+	return Article(
+		id=url or title,
+		title=title,
+		description=description,
+		image=_text(image),
+		url=url,
+		source=_text(source),
+		content=content,
+		published_at=_text(published_at),
+	)
+
+
+def decode_payload(payload: Payload) -> Dict[str, Any]:
+	"""Decode a JSON response body with orjson (raises ``ValueError`` if invalid)."""
+	if isinstance(payload, Mapping):
+		return dict(payload)
+	if isinstance(payload, memoryview):
+		payload = bytes(payload)
+	return orjson.loads(payload) or {}
+
+
+def _iter_raw_articles(payload: Payload) -> Iterator[Mapping[str, Any]]:
+	data = decode_payload(payload)
+	raw = data.get("articles") or []
+	if not isinstance(raw, list):
+		raise ValueError("'articles' is not a list")
+	for a in raw:
+		if isinstance(a, Mapping):
+			yield a
+
+
+def iter_gnews_articles(payload: Payload) -> Iterator[Article]:
+	for a in _iter_raw_articles(payload):
+		article = make_article(
+			a.get("title"),
+			a.get("description"),
+			a.get("url"),
+			a.get("image"),
+			(a.get("source") or {}).get("name"),
+			a.get("publishedAt"),
+		)
+		if article is not None:
+			yield article
+
+
+def iter_newsapi_articles(payload: Payload) -> Iterator[Article]:
+	for a in _iter_raw_articles(payload):
+		article = make_article(
+			a.get("title"),
+			a.get("description"),
+			a.get("url"),
+			a.get("urlToImage"),
+			(a.get("source") or {}).get("name"),
+			a.get("publishedAt"),
+		)
+		if article is not None:
+			yield article
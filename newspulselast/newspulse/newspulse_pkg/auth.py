@@ -1,10 +1,17 @@
 from __future__ import annotations
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 import bcrypt
+import numpy as np
 
 from .config import AppConfig, get_mongo_client_or_none
+from .corpus import TokenCorpus
+
+
+CORPUS_FORMAT = "token-corpus-v2"
+# Well under MongoDB's 16 MB document limit, leaving room for metadata
+_CORPUS_CHUNK_BYTES = 8 * 1024 * 1024
 
 
 def _get_collections():
@@ -62,6 +69,7 @@ def save_documents(documents: List[Dict]) -> int:
 
 	Each document should include at least: username (optional), text, clean, sentiment, entities.
 	Returns number of inserted documents. If MongoDB disabled, returns 0.
+	For large batches ``save_corpus`` stores texts and tokens far more compactly.
 	"""
 	_, docs_col = _get_collections()
 	if docs_col is None or not documents:
@@ -69,3 +77,68 @@ def save_documents(documents: List[Dict]) -> int:
 	res = docs_col.insert_many(documents)
 	return len(res.inserted_ids)
 
+
+def _chunk_bounds(corpus: TokenCorpus, limit: int) -> List[Tuple[int, int]]:
+	"""Document ranges whose serialized ``slice`` stays under ``limit`` bytes.
+
+	Uses an upper bound per document: its ids, offsets and raw text, plus the
+	vocabulary entry of every token occurrence. A single document larger than
+	``limit`` still gets a chunk of its own.
+	"""
+	entry = np.fromiter((len(t.encode("utf-8", errors="surrogatepass")) + 12 for t in corpus.vocab), dtype=np.int64, count=len(corpus.vocab))
+	cost = np.where(corpus.ids >= 0, entry[corpus.ids], 4) if entry.size else np.full(corpus.ids.size, 4, dtype=np.int64)
+	cum = np.concatenate([[0], np.cumsum(cost)])
+	doc_cost = cum[corpus.offsets[1:]] - cum[corpus.offsets[:-1]] + 16
+	if corpus.raw_offsets is not None:
+		doc_cost += np.diff(corpus.raw_offsets)
+	bounds: List[Tuple[int, int]] = []
+	start, size = 0, 0
+	for i, c in enumerate(doc_cost.tolist()):
+		if size and size + c > limit:
+			bounds.append((start, i))
+			start, size = i, 0
+		size += c
+	bounds.append((start, len(corpus)))
+	return bounds
+
+
+def save_corpus(corpus: TokenCorpus, username: Optional[str] = None, metadata: Optional[Dict] = None) -> Optional[Any]:
+	"""Store an analyzed batch as corpus binaries, much smaller than one record per text.
+
+	The corpus is split into chunks of at most ``_CORPUS_CHUNK_BYTES``, one
+	MongoDB record each, so it never reaches the 16 MB document limit; they
+	share a ``corpus_id`` and ``metadata`` goes on the first. Returns the
+	``corpus_id`` for ``load_corpus``, or None if MongoDB is disabled.
+	"""
+	_, docs_col = _get_collections()
+	if docs_col is None:
+		return None
+	from bson import ObjectId
+
+	corpus_id = ObjectId()
+	bounds = _chunk_bounds(corpus, _CORPUS_CHUNK_BYTES)
+	records = []
+	for chunk, (start, stop) in enumerate(bounds):
+		record = dict(metadata or {}) if chunk == 0 else {}
+		record.update({
+			"username": username,
+			"format": CORPUS_FORMAT,
+			"corpus_id": corpus_id,
+			"chunk": chunk,
+			"num_chunks": len(bounds),
+			"num_docs": stop - start,
+			"corpus": corpus.slice(start, stop).to_bytes(),
+		})
+		records.append(record)
+	docs_col.insert_many(records)
+	return corpus_id
+
+
+def load_corpus(corpus_id: Any) -> Optional[TokenCorpus]:
+	_, docs_col = _get_collections()
+	if docs_col is None:
+		return None
+	records = list(docs_col.find({"corpus_id": corpus_id, "format": CORPUS_FORMAT}).sort("chunk", 1))
+	if not records or len(records) != records[0].get("num_chunks"):
+		return None
+	return TokenCorpus.concat([TokenCorpus.from_bytes(bytes(r["corpus"])) for r in records])
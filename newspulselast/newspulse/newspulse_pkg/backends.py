@@ -0,0 +1,115 @@
+"""CPU inference backends for the transformer models.
+
+``torch``       the fp32 PyTorch model as published.
+``torch-int8``  the same model with ``nn.Linear`` layers dynamically quantized to int8.
+``onnx``        an ONNX Runtime graph exported with optimum and dynamically quantized
+                to int8 (requires ``pip install optimum[onnxruntime]``). The export is
+                written under ``ONNX_CACHE_DIR`` (or next to the bundled checkpoint,
+                see ``bundle``) once and reused afterwards.
+
+Every backend returns a model whose forward pass yields ``.logits`` and whose
+``config.id2label`` matches the original checkpoint, so the pipelines and the
+label normalization in ``sentiment`` work unchanged.
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import Tuple
+
+from .bundle import ONNX_INT8_FILE, _missing, hf_path, offline, onnx_dir
+from .config import AppConfig
+
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+_ONNX_FILE = "model.onnx"
+
+
+def check_backend(backend: str) -> str:
+	backend = (backend or "torch").strip().lower()
+	if backend not in BACKENDS:
+		raise ValueError(f"Unknown inference backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+	return backend
+
+
+def model_id(model_name: str, backend: str) -> str:
+	"""Identifier for result caching: quantized backends may score slightly differently."""
+	backend = check_backend(backend)
+	return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+def _quantize_torch(model):
+	import torch
+
+	model.eval()
+	return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _source(model_name: str) -> Tuple[str, dict]:
+	"""Where to load ``model_name`` from: its bundle directory if there is one, else the hub."""
+	path = hf_path(model_name)
+	if path is not None:
+		return path, {"local_files_only": True}
+	return model_name, {}
+
+
+def _onnx_dir(model_name: str, task: str) -> str:
+	path = hf_path(model_name)
+	if path is not None:
+		return onnx_dir(path, task)
+	slug = re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name.strip("/"))
+	return os.path.join(AppConfig().onnx_cache_dir, task, slug)
+
+
+def _load_onnx(source: str, task: str, target: str, export: bool = True):
+	try:
+		from optimum.onnxruntime import ORTModelForSequenceClassification, ORTModelForTokenClassification
+		from onnxruntime.quantization import QuantType, quantize_dynamic
+	except ImportError as exc:
+		raise RuntimeError(
+			"The 'onnx' backend needs ONNX Runtime and optimum: pip install 'optimum[onnxruntime]'"
+		) from exc
+	cls = ORTModelForSequenceClassification if task == "sequence" else ORTModelForTokenClassification
+	quantized = os.path.join(target, ONNX_INT8_FILE)
+	if not os.path.exists(quantized):
+		if not export:
+			raise _missing(f"the int8 ONNX export of {source!r} is not in the bundle (expected {quantized})")
+		os.makedirs(target, exist_ok=True)
+		exported = cls.from_pretrained(source, export=True)
+		exported.save_pretrained(target)
+		# Quantize under a temporary name so an interrupted run never leaves a truncated cache entry
+		partial = os.path.join(target, f".tmp-{os.getpid()}-{ONNX_INT8_FILE}")
+		try:
+			quantize_dynamic(os.path.join(target, _ONNX_FILE), partial, weight_type=QuantType.QInt8)
+			os.replace(partial, quantized)
+		finally:
+			if os.path.exists(partial):
+				os.remove(partial)
+	return cls.from_pretrained(target, file_name=ONNX_INT8_FILE)
+
+
+def _load(model_name: str, backend: str, task: str):
+	from transformers import AutoModelForSequenceClassification, AutoModelForTokenClassification, AutoTokenizer
+
+	backend = check_backend(backend)
+	source, kwargs = _source(model_name)
+	tokenizer = AutoTokenizer.from_pretrained(source, **kwargs)
+	if backend == "onnx":
+		# Offline, exporting at request time would be the slow cold start the bundle exists to avoid
+		return _load_onnx(source, task, _onnx_dir(model_name, task), export=not offline()), tokenizer
+	auto = AutoModelForSequenceClassification if task == "sequence" else AutoModelForTokenClassification
+	model = auto.from_pretrained(source, **kwargs)
+	if backend == "torch-int8":
+		model = _quantize_torch(model)
+	return model, tokenizer
+
+
+def load_sequence_classifier(model_name: str, backend: str = "torch") -> Tuple[object, object]:
+	"""(model, tokenizer) for a sequence classification checkpoint on ``backend``."""
+	return _load(model_name, backend, "sequence")
+
+
+def load_token_classifier(model_name: str, backend: str = "torch") -> Tuple[object, object]:
+	"""(model, tokenizer) for a token classification checkpoint on ``backend``."""
+	return _load(model_name, backend, "token")
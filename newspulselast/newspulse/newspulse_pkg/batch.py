@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+	import pandas as pd
+
+
+def _intern(values: Iterable[str], table: Dict[str, int]) -> np.ndarray:
+	return np.fromiter((table.setdefault(v, len(table)) for v in values), dtype=np.int32)
+
+
+class AnalysisBatch:
+	"""Columnar sentiment and entity results for a batch of documents.
+
+	Sentiment is one label code and one score per document. Entities are flat
+	parallel arrays (document index, label code, start, end, text id) with
+	labels and entity texts interned once. Conversions to pandas and Arrow use
+	the code arrays as categorical / dictionary indices, so nothing is
+	re-encoded, and the ``viz`` charts aggregate straight from the arrays.
+	"""
+
+	__slots__ = (
+		"num_docs",
+		"sentiment_labels",
+		"sentiment_codes",
+		"sentiment_scores",
+		"entity_labels",
+		"entity_texts",
+		"entity_doc",
+		"entity_label",
+		"entity_start",
+		"entity_end",
+		"entity_text",
+	)
+
+	def __init__(
+		self,
+		num_docs: int,
+		sentiment_labels: Sequence[str],
+		sentiment_codes: np.ndarray,
+		sentiment_scores: np.ndarray,
+		entity_labels: Sequence[str],
+		entity_texts: Sequence[str],
+		entity_doc: np.ndarray,
+		entity_label: np.ndarray,
+		entity_start: np.ndarray,
+		entity_end: np.ndarray,
+		entity_text: np.ndarray,
+	):
+		self.num_docs = num_docs
+		self.sentiment_labels = list(sentiment_labels)
+		self.sentiment_codes = sentiment_codes
+		self.sentiment_scores = sentiment_scores
+		self.entity_labels = list(entity_labels)
+		self.entity_texts = list(entity_texts)
+		self.entity_doc = entity_doc
+		self.entity_label = entity_label
+		self.entity_start = entity_start
+		self.entity_end = entity_end
+		self.entity_text = entity_text
+
+	@classmethod
+	def from_results(
+		cls,
+		sentiments: Optional[Sequence[Dict]] = None,
+		entities: Optional[Sequence[Sequence[Dict]]] = None,
+	) -> "AnalysisBatch":
+		"""Build from ``predict_sentiment``-style dicts and per-document entity lists.
+
+		A sentiment code of -1 marks a document without a sentiment result.
+		"""
+		sentiments = list(sentiments or [])
+		entities = list(entities or [])
+		num_docs = max(len(sentiments), len(entities))
+
+		sent_table: Dict[str, int] = {}
+		codes = np.full(num_docs, -1, dtype=np.int16)
+		scores = np.full(num_docs, np.nan, dtype=np.float32)
+		if sentiments:
+			codes[: len(sentiments)] = _intern((str(s.get("label", "")) for s in sentiments), sent_table)
+			scores[: len(sentiments)] = np.fromiter((float(s.get("score", 0.0)) for s in sentiments), dtype=np.float32, count=len(sentiments))
+
+		counts = np.fromiter((len(e) for e in entities), dtype=np.int64, count=len(entities))
+		flat = [e for ents in entities for e in ents]
+		n = len(flat)
+		label_table: Dict[str, int] = {}
+		text_table: Dict[str, int] = {}
+		entity_label = _intern((str(e.get("label") or "") for e in flat), label_table).astype(np.int16)
+		entity_text = _intern((str(e.get("text") or "") for e in flat), text_table)
+		return cls(
+			num_docs,
+			list(sent_table),
+			codes,
+			scores,
+			list(label_table),
+			list(text_table),
+			np.repeat(np.arange(counts.size, dtype=np.int32), counts),
+			entity_label,
+			np.fromiter((-1 if e.get("start") is None else e["start"] for e in flat), dtype=np.int32, count=n),
+			np.fromiter((-1 if e.get("end") is None else e["end"] for e in flat), dtype=np.int32, count=n),
+			entity_text,
+		)
+
+	def __len__(self) -> int:
+		return self.num_docs
+
+	@property
+	def num_entities(self) -> int:
+		return int(self.entity_doc.size)
+
+	def sentiment_counts(self) -> List[Tuple[str, int]]:
+		"""(label, documents) pairs in label order; documents without sentiment are skipped."""
+		codes = self.sentiment_codes[self.sentiment_codes >= 0]
+		counts = np.bincount(codes, minlength=len(self.sentiment_labels))
+		return [(label, int(c)) for label, c in zip(self.sentiment_labels, counts) if c]
+
+	def entity_label_counts(self) -> List[Tuple[str, int]]:
+		counts = np.bincount(self.entity_label, minlength=len(self.entity_labels))
+		return [(label, int(c)) for label, c in zip(self.entity_labels, counts) if c]
+
+	def entity_counts(self) -> pd.DataFrame:
+		"""Mentions per (label, entity), most frequent first (same shape as ``viz.entities_count_table``)."""
+		import pandas as pd
+
+		if not self.num_entities:
+			return pd.DataFrame(columns=["label", "entity", "count"])
+		pair = self.entity_label.astype(np.int64) * max(1, len(self.entity_texts)) + self.entity_text
+		uniq, counts = np.unique(pair, return_counts=True)
+		label_codes, text_codes = np.divmod(uniq, max(1, len(self.entity_texts)))
+		df = pd.DataFrame({
+			"label": np.asarray(self.entity_labels, dtype=object)[label_codes],
+			"entity": np.asarray(self.entity_texts, dtype=object)[text_codes],
+			"count": counts,
+		})
+		return df.sort_values("count", ascending=False, kind="stable").reset_index(drop=True)
+
+	def sentiment_frame(self) -> pd.DataFrame:
+		import pandas as pd
+
+		return pd.DataFrame({
+			"label": pd.Categorical.from_codes(self.sentiment_codes, categories=self.sentiment_labels),
+			"score": self.sentiment_scores,
+		})
+
+	def entity_frame(self) -> pd.DataFrame:
+		import pandas as pd
+
+		return pd.DataFrame({
+			"doc": self.entity_doc,
+			"label": pd.Categorical.from_codes(self.entity_label, categories=self.entity_labels),
+			"entity": pd.Categorical.from_codes(self.entity_text, categories=pd.Index(self.entity_texts, dtype=object)),
+			"start": self.entity_start,
+			"end": self.entity_end,
+		})
+
+	def to_pandas(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+		"""(sentiment frame, entity frame); label and text columns are categoricals over the code arrays."""
+		return self.sentiment_frame(), self.entity_frame()
+
+	def to_arrow(self):
+		"""(sentiment table, entity table) as ``pyarrow.Table`` s with dictionary-encoded labels and texts."""
+		import pyarrow as pa
+
+		def dictionary(codes: np.ndarray, values: Sequence[str]):
+			mask = codes < 0
+			return pa.DictionaryArray.from_arrays(
+				pa.array(codes, mask=mask if mask.any() else None), pa.array(list(values), type=pa.string())
+			)
+
+		sentiment = pa.table({
+			"label": dictionary(self.sentiment_codes, self.sentiment_labels),
+			"score": pa.array(self.sentiment_scores),
+		})
+		entities = pa.table({
+			"doc": pa.array(self.entity_doc),
+			"label": dictionary(self.entity_label, self.entity_labels),
+			"entity": dictionary(self.entity_text, self.entity_texts),
+			"start": pa.array(self.entity_start),
+			"end": pa.array(self.entity_end),
+		})
+		return sentiment, entities
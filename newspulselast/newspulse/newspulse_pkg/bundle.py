@@ -0,0 +1,366 @@
+"""Offline model bundle.
+
+``python -m newspulse_pkg prefetch`` writes every configured model into a
+versioned directory under ``MODEL_BUNDLE_DIR``::
+
+	<MODEL_BUNDLE_DIR>/<version> -> <version>.<build>/
+		manifest.json
+		spacy/<SPACY_MODEL>/          spaCy pipeline (``nlp.to_disk``)
+		nltk/                         NLTK data (stopwords, punkt)
+		hf/<model slug>/              tokenizer + safetensors weights
+		hf/<model slug>/onnx-<task>/  int8 ONNX export, for the ``onnx`` backend
+
+The version is a digest of the model names and of which tasks use the
+``onnx`` backend (the only one with on-disk artifacts), so a replica with the
+same configuration finds the same directory. ``<version>`` is a symlink that
+``prefetch --force`` swaps atomically to a freshly built directory; the build
+it replaced stays on disk until the next prefetch, for replicas still loading
+from it. When that bundle exists the loaders
+read from it; with ``OFFLINE_MODELS=1`` they read only from it and raise
+``ModelBundleError`` instead of downloading anything. Safetensors weights are
+memory-mapped by ``from_pretrained``, so replicas on one host share the pages.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import orjson
+
+from .config import AppConfig
+from .preprocessing import _NLTK_RESOURCES
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+FORMAT = 1
+# File name ``backends`` gives the quantized ONNX graph
+ONNX_INT8_FILE = "model_quantized.onnx"
+
+# Parsed manifests by resolved bundle directory; a swapped symlink resolves to a new key
+_MANIFESTS: Dict[str, Dict] = {}
+_MANIFESTS_LOCK = threading.Lock()
+
+
+class ModelBundleError(RuntimeError):
+	pass
+
+
+def _slug(name: str) -> str:
+	return re.sub(r"[^A-Za-z0-9_.-]+", "--", name.strip("/"))
+
+
+def _onnx_tasks(cfg: AppConfig) -> List[str]:
+	backends = {"sequence": cfg.sentiment_backend, "token": cfg.ner_backend}
+	return [task for task, backend in backends.items() if (backend or "").strip().lower() == "onnx"]
+
+
+def bundle_spec(cfg: Optional[AppConfig] = None) -> Dict[str, object]:
+	"""The models a bundle must contain for ``cfg``."""
+	cfg = cfg or AppConfig()
+	spec: Dict[str, object] = {
+		"format": FORMAT,
+		"spacy": [cfg.spacy_model],
+		"nltk": [resource for resource, _ in _NLTK_RESOURCES],
+		"hf": {
+			"sequence": [cfg.sentiment_model],
+			"token": [cfg.ner_hf_model],
+		},
+	}
+	onnx = _onnx_tasks(cfg)
+	if onnx:
+		# Only added when used, so torch-only bundles keep their version
+		spec["onnx"] = onnx
+	return spec
+
+
+def bundle_version(cfg: Optional[AppConfig] = None) -> str:
+	spec = orjson.dumps(bundle_spec(cfg), option=orjson.OPT_SORT_KEYS)
+	return hashlib.sha256(spec).hexdigest()[:12]
+
+
+def bundle_path(cfg: Optional[AppConfig] = None) -> str:
+	cfg = cfg or AppConfig()
+	return os.path.join(cfg.model_bundle_dir, bundle_version(cfg))
+
+
+def _read_manifest(path: str) -> Optional[Dict]:
+	try:
+		with open(os.path.join(path, MANIFEST), "rb") as fh:
+			return orjson.loads(fh.read())
+	except FileNotFoundError:
+		return None
+
+
+def _cached_manifest(path: str) -> Optional[Dict]:
+	"""``_read_manifest`` parsed once per build; a missing bundle is looked up again next time."""
+	real = os.path.realpath(path)
+	with _MANIFESTS_LOCK:
+		manifest = _MANIFESTS.get(real)
+		if manifest is None:
+			manifest = _read_manifest(real)
+			if manifest is not None:
+				_MANIFESTS[real] = manifest
+	return manifest
+
+
+def _missing(message: str) -> ModelBundleError:
+	return ModelBundleError(f"{message}; run `python -m newspulse_pkg prefetch` with the same configuration")
+
+
+def active_bundle(cfg: Optional[AppConfig] = None) -> Optional[Tuple[str, Dict]]:
+	"""(path, manifest) of the bundle for the current configuration, if present.
+
+	Raises ``ModelBundleError`` when ``OFFLINE_MODELS`` is set and there is none.
+	"""
+	cfg = cfg or AppConfig()
+	path = bundle_path(cfg)
+	manifest = _cached_manifest(path)
+	if manifest is None:
+		if cfg.offline_models:
+			raise _missing(f"OFFLINE_MODELS is set but no model bundle exists at {path}")
+		return None
+	return path, manifest
+
+
+def _entry(section: str, name: str) -> Optional[str]:
+	cfg = AppConfig()
+	bundle = active_bundle(cfg)
+	if bundle is None:
+		return None
+	path, manifest = bundle
+	rel = manifest.get(section, {}).get(name)
+	if rel is None or not os.path.exists(os.path.join(path, rel)):
+		if cfg.offline_models:
+			raise _missing(f"{section} model {name!r} is not in the bundle at {path}")
+		return None
+	return os.path.join(path, rel)
+
+
+def spacy_path(name: str) -> Optional[str]:
+	"""Bundled directory for spaCy pipeline ``name``, or None to load it by name."""
+	return _entry("spacy", name)
+
+
+def hf_path(name: str) -> Optional[str]:
+	"""Bundled directory for Hugging Face checkpoint ``name``, or None to load it by name."""
+	return _entry("hf", name)
+
+
+def nltk_dir() -> Optional[str]:
+	bundle = active_bundle()
+	if bundle is None:
+		return None
+	path, manifest = bundle
+	return os.path.join(path, manifest["nltk_dir"]) if manifest.get("nltk_dir") else None
+
+
+def offline() -> bool:
+	return AppConfig().offline_models
+
+
+# --- prefetch ---------------------------------------------------------------
+
+
+def _prefetch_spacy(name: str, target: str) -> None:
+	from .registry import _load_spacy_package
+
+	os.makedirs(target, exist_ok=True)
+	# Straight from the package, not the registry: the copy needs every component
+	_load_spacy_package(name, ()).to_disk(target)
+
+
+def _prefetch_nltk(target: str) -> None:
+	import nltk
+
+	os.makedirs(target, exist_ok=True)
+	for resource, _ in _NLTK_RESOURCES:
+		if not nltk.download(resource, download_dir=target, quiet=True, raise_on_error=True):
+			raise ModelBundleError(f"Could not download NLTK resource {resource!r}")
+
+
+def onnx_dir(model_dir: str, task: str) -> str:
+	"""Where the int8 ONNX export of a bundled checkpoint lives."""
+	return os.path.join(model_dir, f"onnx-{task}")
+
+
+def _prefetch_hf(name: str, task: str, target: str, onnx: bool) -> None:
+	from transformers import AutoModelForSequenceClassification, AutoModelForTokenClassification, AutoTokenizer
+
+	auto = AutoModelForSequenceClassification if task == "sequence" else AutoModelForTokenClassification
+	AutoTokenizer.from_pretrained(name).save_pretrained(target)
+	# safetensors is the default serialization, which from_pretrained memory-maps
+	auto.from_pretrained(name).save_pretrained(target)
+	if onnx:
+		from .backends import _load_onnx
+
+		_load_onnx(target, task, onnx_dir(target, task))
+
+
+def prefetch(cfg: Optional[AppConfig] = None, force: bool = False) -> str:
+	"""Materialize the models of ``cfg`` into a bundle and return its directory.
+
+	Built in a sibling ``<version>.<build>`` directory and published by
+	atomically replacing the ``<version>`` symlink, so a reader never sees a
+	partial or missing bundle, even on ``force``. An existing bundle is kept
+	unless ``force`` is set. The replaced build is kept for one generation and
+	removed by the prefetch after this one.
+	"""
+	cfg = cfg or AppConfig()
+	final = bundle_path(cfg)
+	if not force and _read_manifest(final) is not None:
+		logger.info("Model bundle already present at %s", final)
+		return final
+	spec = bundle_spec(cfg)
+	os.makedirs(cfg.model_bundle_dir, exist_ok=True)
+	# Microseconds too: a rebuild within the same second must not reuse the live build's name
+	now = time.time()
+	work = f"{final}.{time.strftime('%Y%m%d%H%M%S', time.gmtime(now))}{int(now * 1e6) % 1_000_000:06d}-{os.getpid()}"
+	shutil.rmtree(work, ignore_errors=True)
+	manifest: Dict[str, object] = {
+		"format": FORMAT,
+		"version": os.path.basename(final),
+		"created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+		"spec": spec,
+		"spacy": {},
+		"hf": {},
+		"nltk_dir": "nltk",
+		"libraries": {},
+	}
+	try:
+		for name in spec["spacy"]:
+			rel = os.path.join("spacy", _slug(name))
+			logger.info("spaCy %s -> %s", name, rel)
+			_prefetch_spacy(name, os.path.join(work, rel))
+			manifest["spacy"][name] = rel
+		logger.info("NLTK %s -> nltk", ", ".join(spec["nltk"]))
+		_prefetch_nltk(os.path.join(work, "nltk"))
+		onnx = spec.get("onnx", [])
+		for task, names in spec["hf"].items():
+			for name in names:
+				rel = os.path.join("hf", _slug(name))
+				logger.info("%s -> %s", name, rel)
+				_prefetch_hf(name, task, os.path.join(work, rel), task in onnx)
+				manifest["hf"][name] = rel
+		manifest["libraries"] = _library_versions()
+		with open(os.path.join(work, MANIFEST), "wb") as fh:
+			fh.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+		_publish(work, final)
+	except BaseException:
+		shutil.rmtree(work, ignore_errors=True)
+		raise
+	logger.info("Model bundle written to %s", final)
+	return final
+
+
+def _publish(build: str, final: str) -> None:
+	"""Point ``final`` at ``build``, keeping the build it replaced and pruning older ones."""
+	previous = os.path.realpath(final) if os.path.islink(final) else None
+	aside = f"{final}.old-{os.getpid()}"
+	link = f"{final}.link-{os.getpid()}"
+	try:
+		os.symlink(os.path.basename(build), link)
+	except (OSError, NotImplementedError):
+		# No symlinks (e.g. Windows without the privilege): move the old bundle
+		# aside first so the window without one is just between two renames
+		if os.path.exists(final):
+			os.replace(final, aside)
+			previous = aside
+		os.replace(build, final)
+		_prune(final, keep=(final, previous))
+		return
+	if os.path.isdir(final) and not os.path.islink(final):
+		# A plain directory from an earlier layout: move it aside, then link
+		os.replace(final, aside)
+		os.replace(link, final)
+		previous = aside
+	else:
+		os.replace(link, final)
+	# Replicas may still be loading from the previous build: it goes on the next publish
+	_prune(final, keep=(build, previous))
+
+
+def _prune(final: str, keep: Sequence[Optional[str]]) -> None:
+	"""Remove finished builds and set-aside bundles of ``final`` other than ``keep``."""
+	keep_real = {os.path.realpath(p) for p in keep if p}
+	parent, version = os.path.split(final)
+	pattern = re.compile(rf"{re.escape(version)}\.(\d{{14,}}-\d+|old-\d+)")
+	for name in os.listdir(parent or "."):
+		path = os.path.join(parent, name)
+		if not pattern.fullmatch(name) or os.path.realpath(path) in keep_real:
+			continue
+		# Builds without a manifest are still being written by another prefetch
+		if os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST)):
+			shutil.rmtree(path, ignore_errors=True)
+
+
+def _library_versions() -> Dict[str, str]:
+	from importlib.metadata import PackageNotFoundError, version
+
+	versions = {}
+	for package in ("spacy", "nltk", "transformers", "torch"):
+		try:
+			versions[package] = version(package)
+		except PackageNotFoundError:
+			pass
+	return versions
+
+
+def verify(cfg: Optional[AppConfig] = None) -> List[str]:
+	"""Problems with the bundle for ``cfg`` (empty if every model is present)."""
+	cfg = cfg or AppConfig()
+	path = bundle_path(cfg)
+	manifest = _read_manifest(path)
+	if manifest is None:
+		return [f"no bundle at {path}"]
+	problems = []
+	spec = bundle_spec(cfg)
+	wanted = [("spacy", n) for n in spec["spacy"]] + [("hf", n) for names in spec["hf"].values() for n in names]
+	for section, name in wanted:
+		rel = manifest.get(section, {}).get(name)
+		if rel is None or not os.path.isdir(os.path.join(path, rel)):
+			problems.append(f"{section} model {name!r} missing")
+	for task in spec.get("onnx", []):
+		for name in spec["hf"][task]:
+			rel = manifest.get("hf", {}).get(name)
+			if rel is None or not os.path.exists(os.path.join(onnx_dir(os.path.join(path, rel), task), ONNX_INT8_FILE)):
+				problems.append(f"ONNX export of {name!r} ({task}) missing")
+	nltk_root = os.path.join(path, manifest.get("nltk_dir") or "nltk")
+	for _, rel in _NLTK_RESOURCES:
+		found = os.path.join(nltk_root, rel)
+		if not (os.path.isdir(found) or os.path.exists(found + ".zip")):
+			problems.append(f"NLTK resource {rel!r} missing")
+	return problems
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+	cfg = AppConfig()
+	parser = argparse.ArgumentParser(description="Download the configured models into an offline bundle.")
+	parser.add_argument("--bundle-dir", default=cfg.model_bundle_dir)
+	parser.add_argument("--force", action="store_true", help="rebuild even if the bundle exists")
+	parser.add_argument("--check", action="store_true", help="only verify the bundle, exit 1 if incomplete")
+	parser.add_argument("-v", "--verbose", action="store_true")
+	args = parser.parse_args(argv)
+
+	logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+	cfg.model_bundle_dir = args.bundle_dir
+	if args.check:
+		problems = verify(cfg)
+		for msg in problems:
+			print(f"FAIL: {msg}")
+		if not problems:
+			print(bundle_path(cfg))
+		raise SystemExit(1 if problems else 0)
+	print(prefetch(cfg, force=args.force))
+
+
+if __name__ == "__main__":
+	main()
@@ -1,24 +1,101 @@
 import os
-from dataclasses import dataclass
-from typing import Optional
-from dotenv import load_dotenv
-from pymongo import MongoClient
+import tempfile
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
+if TYPE_CHECKING:
+	from pymongo import MongoClient
+
+
+_DOTENV_LOADED = False
+
+
+def _load_dotenv() -> None:
+	# Deferred from import time: read .env on the first AppConfig() instead
+	global _DOTENV_LOADED
+	if not _DOTENV_LOADED:
+		_DOTENV_LOADED = True
+		from dotenv import load_dotenv
+		load_dotenv()
+
+
+def _flag(value: str) -> bool:
+	return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env(name: str, default: str, cast: Callable[[str], Any] = str):
+	def read():
+		_load_dotenv()
+		return cast(os.getenv(name, default))
+	return field(default_factory=read)
 
-load_dotenv()
 
 @dataclass
 class AppConfig:
-	app_title: str = os.getenv("APP_TITLE", "NewsPulse – NLP Analysis")
-	mongodb_uri: str = os.getenv("MONGODB_URI", "")
-	mongodb_db: str = os.getenv("MONGODB_DB", "newspulse")
-	users_collection: str = os.getenv("MONGODB_USERS_COLLECTION", "users")
-	docs_collection: str = os.getenv("MONGODB_DOCS_COLLECTION", "documents")
-	sentiment_model: str = os.getenv(
+	app_title: str = _env("APP_TITLE", "NewsPulse – NLP Analysis")
+	mongodb_uri: str = _env("MONGODB_URI", "")
+	mongodb_db: str = _env("MONGODB_DB", "newspulse")
+	users_collection: str = _env("MONGODB_USERS_COLLECTION", "users")
+	docs_collection: str = _env("MONGODB_DOCS_COLLECTION", "documents")
+	sentiment_model: str = _env(
 		"SENTIMENT_MODEL",
 		"cardiffnlp/twitter-roberta-base-sentiment-latest",
 	)
-	ner_hf_model: str = os.getenv("NER_HF_MODEL", "dslim/bert-base-NER")
+	ner_hf_model: str = _env("NER_HF_MODEL", "dslim/bert-base-NER")
+	sentiment_backend: str = _env("SENTIMENT_BACKEND", "torch")
+	ner_backend: str = _env("NER_BACKEND", "torch")
+	onnx_cache_dir: str = _env(
+		"ONNX_CACHE_DIR",
+		os.path.join(os.path.expanduser("~"), ".cache", "newspulse", "onnx"),
+	)
+	sentiment_batch_size: int = _env("SENTIMENT_BATCH_SIZE", "32", int)
+	sentiment_max_length: int = _env("SENTIMENT_MAX_LENGTH", "512", int)
+	sentiment_window_stride: int = _env("SENTIMENT_WINDOW_STRIDE", "64", int)
+	sentiment_doc_weighting: str = _env("SENTIMENT_DOC_WEIGHTING", "length")
+	ner_batch_size: int = _env("NER_BATCH_SIZE", "16", int)
+	ner_max_length: int = _env("NER_MAX_LENGTH", "512", int)
+	ner_stride: int = _env("NER_STRIDE", "128", int)
+	torch_num_threads: int = _env("TORCH_NUM_THREADS", "0", int)
+	model_bundle_dir: str = _env(
+		"MODEL_BUNDLE_DIR",
+		os.path.join(os.path.expanduser("~"), ".cache", "newspulse", "models"),
+	)
+	offline_models: bool = _env("OFFLINE_MODELS", "0", _flag)
+	spacy_model: str = _env("SPACY_MODEL", "en_core_web_sm")
+	warmup_models: str = _env("WARMUP_MODELS", "")
+	spacy_batch_size: int = _env("SPACY_BATCH_SIZE", "64", int)
+	spacy_n_process: int = _env("SPACY_N_PROCESS", "-1", int)
+	spacy_multiprocess_min_docs: int = _env("SPACY_MULTIPROCESS_MIN_DOCS", "1000", int)
+	analysis_cache_path: str = _env(
+		"ANALYSIS_CACHE_PATH",
+		os.path.join(os.path.expanduser("~"), ".cache", "newspulse", "analysis.sqlite3"),
+	)
+	analysis_cache_memory_items: int = _env("ANALYSIS_CACHE_MEMORY_ITEMS", "20000", int)
+	analysis_cache_disk_items: int = _env("ANALYSIS_CACHE_DISK_ITEMS", "500000", int)
+	gnews_base_url: str = _env("GNEWS_BASE_URL", "https://gnews.io/api/v4")
+	http_pool_size: int = _env("HTTP_POOL_SIZE", "10", int)
+	response_cache_path: str = _env("RESPONSE_CACHE_PATH", "")
+	response_cache_max_entries: int = _env("RESPONSE_CACHE_MAX_ENTRIES", "256", int)
+	response_cache_ttl_headlines: float = _env("RESPONSE_CACHE_TTL_HEADLINES", "300", float)
+	response_cache_ttl_search: float = _env("RESPONSE_CACHE_TTL_SEARCH", "120", float)
+	response_cache_stale_ttl: float = _env("RESPONSE_CACHE_STALE_TTL", "1800", float)
+	rate_limit_path: str = _env(
+		"RATE_LIMIT_PATH",
+		os.path.join(tempfile.gettempdir(), "newspulse_ratelimit.sqlite3"),
+	)
+	gnews_requests_per_second: float = _env("GNEWS_REQUESTS_PER_SECOND", "1", float)
+	gnews_burst: int = _env("GNEWS_BURST", "4", int)
+	gnews_daily_quota: int = _env("GNEWS_DAILY_QUOTA", "100", int)
+	gnews_max_wait: float = _env("GNEWS_MAX_WAIT", "2", float)
+	article_store_path: str = _env("ARTICLE_STORE_PATH", "")
+	article_store_max_age: float = _env("ARTICLE_STORE_MAX_AGE", "1800", float)
+	ingest_categories: str = _env("INGEST_CATEGORIES", "entertainment,finance,sports,technology")
+	ingest_rss_feeds: str = _env("INGEST_RSS_FEEDS", "")
+	ingest_interval: float = _env("INGEST_INTERVAL", "600", float)
+	ag_news_cache_dir: str = _env(
+		"AG_NEWS_CACHE_DIR",
+		os.path.join(os.path.expanduser("~"), ".cache", "newspulse", "ag_news"),
+	)
 
 
 def get_mongo_client_or_none() -> Optional["MongoClient"]:
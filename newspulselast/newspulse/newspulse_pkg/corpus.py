@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import struct
+from collections.abc import Mapping, Sequence as SequenceABC
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import orjson
+
+from .ngrams import NgramStats, Vocabulary
+
+
+_MAGIC = b"NPCORP1\0"
+_ALIGN = 8
+
+
+def _pack_strings(strings: Sequence[str]) -> tuple:
+	"""UTF-8 bytes of ``strings`` concatenated, plus int64 offsets (len + 1)."""
+	encoded = [s.encode("utf-8", errors="surrogatepass") for s in strings]
+	offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+	np.cumsum([len(b) for b in encoded], out=offsets[1:])
+	return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class DocumentView(Mapping):
+	"""Read-only ``{"raw", "clean", "tokens"}`` view of one corpus document.
+
+	Behaves like the dicts ``preprocess_texts`` used to return; strings are
+	decoded from the shared arrays only when a key is read.
+	"""
+
+	__slots__ = ("_corpus", "_index")
+
+	_KEYS = ("raw", "clean", "tokens")
+
+	def __init__(self, corpus: "TokenCorpus", index: int):
+		self._corpus = corpus
+		self._index = index
+
+	def __getitem__(self, key: str):
+		if key == "tokens":
+			return self._corpus.tokens(self._index)
+		if key == "clean":
+			return " ".join(self._corpus.tokens(self._index))
+		if key == "raw":
+			return self._corpus.raw(self._index)
+		raise KeyError(key)
+
+	def __iter__(self) -> Iterator[str]:
+		return iter(self._KEYS)
+
+	def __len__(self) -> int:
+		return len(self._KEYS)
+
+	@property
+	def token_ids(self) -> np.ndarray:
+		return self._corpus.token_ids(self._index)
+
+
+class TokenCorpus(SequenceABC):
+	"""Tokenized documents stored CSR-style.
+
+	Every token is an int32 id into one interned vocabulary; document ``i``
+	owns ``ids[offsets[i]:offsets[i + 1]]``. Raw texts are kept as one UTF-8
+	buffer with their own offsets. Indexing yields lazy ``DocumentView`` s.
+	``to_bytes``/``from_bytes`` use a flat binary layout whose arrays are read
+	back with ``np.frombuffer``, without copying.
+	"""
+
+	def __init__(
+		self,
+		vocab: Sequence[str],
+		ids: np.ndarray,
+		offsets: np.ndarray,
+		raw_bytes: Optional[np.ndarray] = None,
+		raw_offsets: Optional[np.ndarray] = None,
+	):
+		self.vocab = list(vocab)
+		self.ids = ids
+		self.offsets = offsets
+		self.raw_bytes = raw_bytes
+		self.raw_offsets = raw_offsets
+
+	@classmethod
+	def from_tokens(cls, tokens_list: Iterable[Sequence[str]], raws: Optional[Sequence[str]] = None, vocab: Optional[Vocabulary] = None) -> "TokenCorpus":
+		docs = tokens_list if isinstance(tokens_list, list) else list(tokens_list)
+		vocab = vocab if vocab is not None else Vocabulary()
+		ids = vocab.encode(chain.from_iterable(docs))
+		offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+		np.cumsum([len(d) for d in docs], out=offsets[1:])
+		raw_bytes = raw_offsets = None
+		if raws is not None:
+			raw_bytes, raw_offsets = _pack_strings(["" if r is None else str(r) for r in raws])
+		return cls(vocab.tokens(), ids, offsets, raw_bytes, raw_offsets)
+
+	@classmethod
+	def from_analyses(cls, docs: Iterable) -> "TokenCorpus":
+		"""Build from ``analysis.DocAnalysis`` results (tokens and raw text)."""
+		docs = list(docs)
+		return cls.from_tokens([d.tokens for d in docs], raws=[d.raw for d in docs])
+
+	def __len__(self) -> int:
+		return int(self.offsets.size) - 1
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [DocumentView(self, i) for i in range(*index.indices(len(self)))]
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError(index)
+		return DocumentView(self, index)
+
+	def token_ids(self, index: int) -> np.ndarray:
+		return self.ids[self.offsets[index] : self.offsets[index + 1]]
+
+	def tokens(self, index: int) -> List[str]:
+		vocab = self.vocab
+		return [vocab[i] if i >= 0 else "" for i in self.token_ids(index).tolist()]
+
+	def raw(self, index: int) -> Optional[str]:
+		if self.raw_bytes is None:
+			return None
+		start, end = int(self.raw_offsets[index]), int(self.raw_offsets[index + 1])
+		return self.raw_bytes[start:end].tobytes().decode("utf-8", errors="surrogatepass")
+
+	def slice(self, start: int, stop: int) -> "TokenCorpus":
+		"""Documents ``start:stop`` as a standalone corpus holding only the vocabulary they use."""
+		lo, hi = int(self.offsets[start]), int(self.offsets[stop])
+		ids = self.ids[lo:hi]
+		used, inverse = np.unique(ids[ids >= 0], return_inverse=True)
+		local = np.full(ids.size, -1, dtype=np.int32)
+		local[ids >= 0] = inverse
+		raw_bytes = raw_offsets = None
+		if self.raw_bytes is not None:
+			rlo, rhi = int(self.raw_offsets[start]), int(self.raw_offsets[stop])
+			raw_bytes, raw_offsets = self.raw_bytes[rlo:rhi], self.raw_offsets[start : stop + 1] - rlo
+		vocab = self.vocab
+		return TokenCorpus([vocab[i] for i in used.tolist()], local, self.offsets[start : stop + 1] - lo, raw_bytes, raw_offsets)
+
+	@classmethod
+	def concat(cls, parts: Sequence["TokenCorpus"]) -> "TokenCorpus":
+		"""Inverse of splitting with ``slice``: one corpus over the union of the parts' vocabularies."""
+		vocab = Vocabulary()
+		ids, offsets, raw_bytes, raw_offsets = [], [np.zeros(1, dtype=np.int64)], [], [np.zeros(1, dtype=np.int64)]
+		with_raw = bool(parts) and all(p.raw_bytes is not None for p in parts)
+		for part in parts:
+			# One spare slot so break tokens (-1) map to -1
+			mapping = np.append(vocab.encode(part.vocab), np.int32(-1))
+			ids.append(mapping[part.ids])
+			offsets.append(part.offsets[1:] + offsets[-1][-1])
+			if with_raw:
+				raw_bytes.append(part.raw_bytes)
+				raw_offsets.append(part.raw_offsets[1:] + raw_offsets[-1][-1])
+		return cls(
+			vocab.tokens(),
+			np.concatenate(ids) if ids else np.zeros(0, dtype=np.int32),
+			np.concatenate(offsets),
+			np.concatenate(raw_bytes) if with_raw else None,
+			np.concatenate(raw_offsets) if with_raw else None,
+		)
+
+	def tokens_list(self) -> List[List[str]]:
+		return [self.tokens(i) for i in range(len(self))]
+
+	def ngram_stats(self, max_n: int = 3) -> NgramStats:
+		"""N-gram statistics straight from the id array, without re-encoding tokens."""
+		return NgramStats.from_ids(Vocabulary(self.vocab), self.ids, np.diff(self.offsets), max_n=max_n)
+
+	@property
+	def nbytes(self) -> int:
+		"""Array memory, excluding the vocabulary strings."""
+		total = self.ids.nbytes + self.offsets.nbytes
+		if self.raw_bytes is not None:
+			total += self.raw_bytes.nbytes + self.raw_offsets.nbytes
+		return total
+
+	def to_bytes(self) -> bytes:
+		vocab_bytes, vocab_offsets = _pack_strings(self.vocab)
+		sections = [
+			("vocab_offsets", vocab_offsets),
+			("ids", np.ascontiguousarray(self.ids, dtype=np.int32)),
+			("offsets", np.ascontiguousarray(self.offsets, dtype=np.int64)),
+		]
+		if self.raw_bytes is not None:
+			sections.append(("raw_offsets", np.ascontiguousarray(self.raw_offsets, dtype=np.int64)))
+			sections.append(("raw_bytes", self.raw_bytes))
+		sections.append(("vocab_bytes", vocab_bytes))
+		header = {name: [arr.dtype.str, int(arr.size)] for name, arr in sections}
+		header["order"] = [name for name, _ in sections]
+		head = orjson.dumps(header)
+		out = bytearray(_MAGIC)
+		out += struct.pack("<I", len(head))
+		out += head
+		for _, arr in sections:
+			out += b"\0" * (-len(out) % _ALIGN)
+			out += arr.tobytes()
+		return bytes(out)
+
+	@classmethod
+	def from_bytes(cls, data) -> "TokenCorpus":
+		"""Inverse of ``to_bytes``; arrays are views into ``data`` (bytes, mmap, ...)."""
+		buf = memoryview(data)
+		if bytes(buf[: len(_MAGIC)]) != _MAGIC:
+			raise ValueError("Not a serialized TokenCorpus")
+		pos = len(_MAGIC)
+		(head_len,) = struct.unpack_from("<I", buf, pos)
+		pos += 4
+		header = orjson.loads(bytes(buf[pos : pos + head_len]))
+		pos += head_len
+		arrays = {}
+		for name in header["order"]:
+			dtype, count = header[name]
+			pos += -pos % _ALIGN
+			arr = np.frombuffer(buf, dtype=np.dtype(dtype), count=count, offset=pos)
+			arrays[name] = arr
+			pos += arr.nbytes
+		vocab_bytes, vocab_offsets = arrays["vocab_bytes"].tobytes(), arrays["vocab_offsets"].tolist()
+		vocab = [
+			vocab_bytes[vocab_offsets[i] : vocab_offsets[i + 1]].decode("utf-8", errors="surrogatepass")
+			for i in range(len(vocab_offsets) - 1)
+		]
+		return cls(vocab, arrays["ids"], arrays["offsets"], arrays.get("raw_bytes"), arrays.get("raw_offsets"))
@@ -0,0 +1,113 @@
+"""Headless ingestion service.
+
+Polls the configured GNews categories and RSS feeds on a schedule and appends
+new articles to the local ``ArticleStore`` so the Streamlit UI can read them
+without fetching on demand. Run with::
+
+	ARTICLE_STORE_PATH=articles.sqlite3 python -m newspulse_pkg.daemon
+
+``check_ingestion.py`` runs it against a local fake GNews server (via
+``GNEWS_BASE_URL``) to exercise it offline.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from .config import AppConfig
+from .ingestion import RssIngester
+from .news_api import fetch_news_categories
+from .store import ArticleStore
+
+
+logger = logging.getLogger("newspulse.daemon")
+
+RSS_CATEGORY = "rss"
+
+
+def _split(value: str) -> List[str]:
+	return [v.strip() for v in value.split(",") if v.strip()]
+
+
+class IngestionDaemon:
+	def __init__(
+		self,
+		store: ArticleStore,
+		categories: Sequence[str],
+		feeds: Sequence[str] = (),
+		interval: float = 600.0,
+		limit: int = 20,
+	):
+		self.store = store
+		self.categories = list(categories)
+		self.feeds = list(feeds)
+		self.interval = max(1.0, float(interval))
+		self.limit = limit
+		self.rss = RssIngester(limit_per_feed=limit)
+		self._stop = threading.Event()
+
+	def run_once(self) -> Dict[str, int]:
+		"""Poll every source once; return new-article counts per category."""
+		added: Dict[str, int] = {}
+		if self.categories:
+			fetched, errors = fetch_news_categories(self.categories, self.limit)
+			for cat, msg in errors.items():
+				logger.warning("GNews %s failed: %s", cat, msg)
+			for cat, articles in fetched.items():
+				added[cat] = self.store.append(cat, articles)
+		if self.feeds:
+			articles, reports = self.rss.poll(self.feeds)
+			for report in reports:
+				if report.ok:
+					logger.debug("RSS %s: %s new in %.2fs", report.url, report.new_entries, report.latency)
+				else:
+					logger.warning("RSS %s failed after %.2fs: %s", report.url, report.latency, report.error)
+			added[RSS_CATEGORY] = self.store.append(RSS_CATEGORY, articles)
+		logger.info("Ingested %s (store size %d)", added, len(self.store))
+		return added
+
+	def run_forever(self) -> None:
+		while not self._stop.is_set():
+			try:
+				self.run_once()
+			except Exception:
+				logger.exception("Ingestion cycle failed")
+			self._stop.wait(self.interval)
+
+	def stop(self) -> None:
+		self._stop.set()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+	cfg = AppConfig()
+	parser = argparse.ArgumentParser(description="Poll news sources into the local article store.")
+	parser.add_argument("--store", default=cfg.article_store_path or "articles.sqlite3")
+	parser.add_argument("--categories", default=cfg.ingest_categories)
+	parser.add_argument("--feeds", default=cfg.ingest_rss_feeds)
+	parser.add_argument("--interval", type=float, default=cfg.ingest_interval)
+	parser.add_argument("--limit", type=int, default=20)
+	parser.add_argument("--once", action="store_true", help="poll once and exit")
+	parser.add_argument("-v", "--verbose", action="store_true")
+	args = parser.parse_args(argv)
+
+	logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+	daemon = IngestionDaemon(
+		ArticleStore(args.store),
+		_split(args.categories),
+		_split(args.feeds),
+		interval=args.interval,
+		limit=args.limit,
+	)
+	if args.once:
+		daemon.run_once()
+		return
+	try:
+		daemon.run_forever()
+	except KeyboardInterrupt:
+		daemon.stop()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+_PRIME = np.uint64(4294967291)  # largest prime below 2**32
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_TRACKING_PREFIXES = ("utm_", "fbclid", "gclid", "ocid", "cmpid")
+
+
+def normalize_url(url: str) -> str:
+	"""Canonical form of an article URL for exact matching (scheme, tracking params and trailing slash dropped)."""
+	url = (url or "").strip()
+	if not url:
+		return ""
+	parts = urlsplit(url)
+	query = "&".join(
+		q for q in parts.query.split("&")
+		if q and not q.lower().startswith(_TRACKING_PREFIXES)
+	)
+	path = parts.path.rstrip("/")
+	host = parts.netloc.lower()
+	if host.startswith("www."):
+		host = host[4:]
+	return f"{host}{path}" + (f"?{query}" if query else "")
+
+
+class MinHasher:
+	"""MinHash signatures over word shingles with LSH banding.
+
+	Hashes are ``(a * h + b) mod p`` over 32-bit shingle hashes, computed for all
+	permutations at once with NumPy.
+	"""
+
+	def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 3, seed: int = 1):
+		if num_perm % bands:
+			raise ValueError("num_perm must be divisible by bands")
+		self.num_perm = num_perm
+		self.bands = bands
+		self.rows = num_perm // bands
+		self.shingle_size = shingle_size
+		rng = np.random.default_rng(seed)
+		self._a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+		self._b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+
+	def shingles(self, text: str) -> np.ndarray:
+		words = _WORD_RE.findall((text or "").lower())
+		k = self.shingle_size
+		if len(words) < k:
+			grams = [" ".join(words)] if words else []
+		else:
+			grams = [" ".join(words[i : i + k]) for i in range(len(words) - k + 1)]
+		return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in set(grams)), dtype=np.uint64)
+
+	def signature(self, text: str) -> np.ndarray | None:
+		hashes = self.shingles(text)
+		if hashes.size == 0:
+			return None
+		return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+
+	def band_keys(self, signature: np.ndarray) -> List[bytes]:
+		return [signature[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+
+def _find(parent: List[int], i: int) -> int:
+	while parent[i] != i:
+		parent[i] = parent[parent[i]]
+		i = parent[i]
+	return i
+
+
+def _union(parent: List[int], i: int, j: int) -> None:
+	ri, rj = _find(parent, i), _find(parent, j)
+	if ri == rj:
+		return
+	# keep the earliest item as the canonical one
+	if rj < ri:
+		ri, rj = rj, ri
+	parent[rj] = ri
+
+
+def find_duplicates(
+	keys: Sequence[str],
+	texts: Sequence[str],
+	threshold: float = 0.7,
+	hasher: MinHasher | None = None,
+) -> List[int]:
+	"""For each item return the index of its canonical (first-seen) duplicate.
+
+	Items sharing a non-empty key are exact duplicates. Near duplicates are
+	found by LSH banding on MinHash signatures: only items that share a band
+	bucket are compared, so cost grows with the number of candidates rather
+	than with all pairs. Candidates are confirmed when the estimated Jaccard
+	similarity reaches ``threshold``.
+	"""
+	n = len(texts)
+	parent = list(range(n))
+	first_by_key: Dict[str, int] = {}
+	for i, key in enumerate(keys):
+		if not key:
+			continue
+		if key in first_by_key:
+			_union(parent, first_by_key[key], i)
+		else:
+			first_by_key[key] = i
+
+	hasher = hasher or MinHasher()
+	signatures = [hasher.signature(t) for t in texts]
+	buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+	for i, sig in enumerate(signatures):
+		if sig is None:
+			continue
+		for band, key in enumerate(hasher.band_keys(sig)):
+			buckets[(band, key)].append(i)
+	checked = set()
+	for members in buckets.values():
+		if len(members) < 2:
+			continue
+		for pos, j in enumerate(members):
+			for i in members[:pos]:
+				if (i, j) in checked or _find(parent, i) == _find(parent, j):
+					continue
+				checked.add((i, j))
+				similarity = float(np.mean(signatures[i] == signatures[j]))
+				if similarity >= threshold:
+					_union(parent, i, j)
+	return [_find(parent, i) for i in range(n)]
+
+
+class DedupResult:
+	__slots__ = ("groups", "duplicates")
+
+	def __init__(self, groups: Dict[str, List], duplicates: Dict[str, List[Tuple[str, str]]]):
+		# unique articles per group, in input order
+		self.groups = groups
+		# canonical article id -> [(group, duplicate article id), ...]
+		self.duplicates = duplicates
+
+	def also_in(self, article_id: str) -> List[str]:
+		return sorted({g for g, _ in self.duplicates.get(article_id, [])})
+
+
+def dedupe_articles(groups: Mapping[str, Iterable], threshold: float = 0.7) -> DedupResult:
+	"""Remove exact and near-duplicate articles across groups (e.g. categories).
+
+	The first occurrence (in group order, then article order) is kept in its
+	group; later copies are dropped and recorded in ``duplicates``.
+	"""
+	flat: List[Tuple[str, object]] = [(g, a) for g, items in groups.items() for a in items]
+	keys = [normalize_url(a.get("url") or "") or (a.get("id") or "") for _, a in flat]
+	texts = [a.get("content") or a.get("description") or a.get("title") or "" for _, a in flat]
+	canonical = find_duplicates(keys, texts, threshold=threshold)
+	unique: Dict[str, List] = {g: [] for g in groups}
+	duplicates: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+	for i, (group, article) in enumerate(flat):
+		root = canonical[i]
+		if root == i:
+			unique[group].append(article)
+		else:
+			duplicates[flat[root][1].get("id")].append((group, article.get("id")))
+	return DedupResult(unique, dict(duplicates))
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import AppConfig
+
+
+# Query/header names that carry credentials; they never take part in cache keys.
+SECRET_PARAMS = frozenset({"token", "apikey", "api_key", "x-api-key"})
+
+_VALIDATOR_LIMIT = 256
+_POOL_LIMIT = 256
+
+_LOCK = threading.Lock()
+_ADAPTER: HTTPAdapter | None = None
+_SESSION: requests.Session | None = None
+# Every urllib3 pool a response came through, for ``pool_stats``
+_POOLS: "OrderedDict[int, object]" = OrderedDict()
+_VALIDATORS: "OrderedDict[Tuple, _Validated]" = OrderedDict()
+_COUNTERS: Dict[str, int] = {"not_modified": 0}
+
+
+class _Validated:
+	__slots__ = ("etag", "last_modified", "content", "headers", "encoding")
+
+	def __init__(self, etag: str | None, last_modified: str | None, content: bytes, headers: Mapping[str, str], encoding: str | None):
+		self.etag = etag
+		self.last_modified = last_modified
+		self.content = content
+		self.headers = dict(headers)
+		self.encoding = encoding
+
+
+def _track_pool(resp: requests.Response, *args, **kwargs) -> None:
+	# The lookup the adapter itself made for this request, so it returns the same pool
+	pool = _ADAPTER.get_connection_with_tls_context(
+		resp.request, kwargs.get("verify", True), kwargs.get("proxies"), kwargs.get("cert")
+	)
+	with _LOCK:
+		_POOLS[id(pool)] = pool
+		_POOLS.move_to_end(id(pool))
+		while len(_POOLS) > _POOL_LIMIT:
+			_POOLS.popitem(last=False)
+
+
+def get_session() -> requests.Session:
+	"""Return the process-wide session and its pooled keep-alive adapter.
+
+	One session is shared by every thread, including short-lived fetch
+	workers, so its connections outlive any single batch. It is only used
+	for plain GETs: headers are fixed at creation and per-request headers are
+	passed per call, and the cookie jar locks internally.
+	"""
+	global _ADAPTER, _SESSION
+	if _SESSION is None:
+		with _LOCK:
+			if _SESSION is None:
+				size = max(1, AppConfig().http_pool_size)
+				_ADAPTER = HTTPAdapter(pool_connections=size, pool_maxsize=size, pool_block=False)
+				session = requests.Session()
+				session.mount("https://", _ADAPTER)
+				session.mount("http://", _ADAPTER)
+				session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+				session.hooks["response"].append(_track_pool)
+				_SESSION = session
+	return _SESSION
+
+
+def cache_key(url: str, params: Optional[Mapping] = None) -> Tuple:
+	"""Stable key for a request with credential parameters dropped."""
+	items = tuple(sorted(
+		(str(k), str(v)) for k, v in (params or {}).items() if str(k).lower() not in SECRET_PARAMS
+	))
+	return (url, items)
+
+
+def _remember(key: Tuple, resp: requests.Response) -> None:
+	etag = resp.headers.get("ETag")
+	last_modified = resp.headers.get("Last-Modified")
+	with _LOCK:
+		if not etag and not last_modified:
+			_VALIDATORS.pop(key, None)
+			return
+		_VALIDATORS[key] = _Validated(etag, last_modified, resp.content, resp.headers, resp.encoding)
+		_VALIDATORS.move_to_end(key)
+		while len(_VALIDATORS) > _VALIDATOR_LIMIT:
+			_VALIDATORS.popitem(last=False)
+
+
+def conditional_get(
+	url: str,
+	params: Optional[Mapping] = None,
+	headers: Optional[Mapping[str, str]] = None,
+	timeout: float = 15,
+) -> requests.Response:
+	"""GET through the shared pool, revalidating with ETag/Last-Modified.
+
+	A ``304 Not Modified`` is turned back into a ``200`` carrying the body
+	stored from the last full response, so callers never see the difference.
+	"""
+	key = cache_key(url, params)
+	req_headers = dict(headers or {})
+	with _LOCK:
+		cached = _VALIDATORS.get(key)
+		if cached is not None:
+			_VALIDATORS.move_to_end(key)
+	if cached is not None:
+		if cached.etag:
+			req_headers["If-None-Match"] = cached.etag
+		if cached.last_modified:
+			req_headers["If-Modified-Since"] = cached.last_modified
+	resp = get_session().get(url, params=params, headers=req_headers, timeout=timeout)
+	if resp.status_code == 304 and cached is not None:
+		with _LOCK:
+			_COUNTERS["not_modified"] += 1
+		return _replay(resp, cached)
+	if resp.status_code == 200:
+		_remember(key, resp)
+	return resp
+
+
+def _replay(resp: requests.Response, cached: _Validated) -> requests.Response:
+	replay = requests.Response()
+	replay.status_code = 200
+	replay.reason = "OK"
+	replay.url = resp.url
+	replay.request = resp.request
+	replay.elapsed = resp.elapsed
+	replay.headers.update(cached.headers)
+	replay.headers.update(resp.headers)
+	replay.headers.pop("Content-Length", None)
+	replay.encoding = cached.encoding
+	replay._content = cached.content
+	replay.revalidated = True  # type: ignore[attr-defined]
+	return replay
+
+
+def pool_stats() -> Dict[str, int]:
+	"""Connection reuse counters for the shared pool.
+
+	``misses`` is the number of new TCP/TLS connections opened, ``hits`` the
+	number of requests served over an already-open keep-alive connection.
+	Summed from the public ``num_requests``/``num_connections`` counters of
+	every urllib3 pool the shared session has used (a response hook records
+	them), so pools the manager has since evicted still count.
+	"""
+	requests_sent = 0
+	connections = 0
+	with _LOCK:
+		pools = list(_POOLS.values())
+	for pool in pools:
+		requests_sent += pool.num_requests
+		connections += pool.num_connections
+	with _LOCK:
+		stats = dict(_COUNTERS)
+	stats.update({
+		"requests": requests_sent,
+		"hits": max(0, requests_sent - connections),
+		"misses": connections,
+	})
+	return stats
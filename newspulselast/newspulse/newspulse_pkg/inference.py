@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from .config import AppConfig
+
+
+logger = logging.getLogger("newspulse.inference")
+
+_THREADS_LOCK = threading.Lock()
+_THREADS_SET = False
+
+
+def configure_torch_threads(num_threads: Optional[int] = None) -> None:
+	"""Apply ``TORCH_NUM_THREADS`` (intra-op threads) once per process; 0 keeps torch's default."""
+	global _THREADS_SET
+	with _THREADS_LOCK:
+		if _THREADS_SET:
+			return
+		n = AppConfig().torch_num_threads if num_threads is None else num_threads
+		if n and n > 0:
+			torch.set_num_threads(int(n))
+		_THREADS_SET = True
+
+
+class InferenceStats:
+	__slots__ = ("texts", "tokens", "batches", "seconds")
+
+	def __init__(self, texts: int = 0, tokens: int = 0, batches: int = 0, seconds: float = 0.0):
+		self.texts = texts
+		self.tokens = tokens
+		self.batches = batches
+		self.seconds = seconds
+
+	@property
+	def tokens_per_second(self) -> float:
+		return self.tokens / self.seconds if self.seconds > 0 else 0.0
+
+	def as_dict(self) -> dict:
+		return {
+			"texts": self.texts,
+			"tokens": self.tokens,
+			"batches": self.batches,
+			"seconds": self.seconds,
+			"tokens_per_second": self.tokens_per_second,
+		}
+
+
+class _BatchedEngine:
+	"""Length-sorted, dynamically padded micro-batching over a transformers model.
+
+	Inputs are tokenized once without padding, sorted by length and run in
+	fixed-size micro-batches, so each batch is padded only to its own longest
+	member. Forward passes run under ``torch.inference_mode`` and results are
+	returned in the original input order.
+	"""
+
+	def __init__(self, model, tokenizer, batch_size: int = 32, max_length: int = 512):
+		self.model = model
+		self.tokenizer = tokenizer
+		self.batch_size = max(1, int(batch_size))
+		self.max_length = int(max_length)
+		self.last_stats = InferenceStats()
+		self.total_stats = InferenceStats()
+		self._lock = threading.Lock()
+		if hasattr(model, "eval"):
+			model.eval()
+		config = getattr(model, "config", None)
+		self.id2label = dict(getattr(config, "id2label", None) or {})
+		# ONNX Runtime models (optimum) list their graph inputs; BERT exports take
+		# token_type_ids, which some optimum versions do not default when omitted
+		self._token_type_ids = "token_type_ids" in (getattr(model, "input_names", None) or ())
+
+	def label_name(self, index: int) -> str:
+		return str(self.id2label.get(int(index), f"LABEL_{int(index)}"))
+
+	def _collate(self, rows: Sequence[Sequence[int]]) -> dict:
+		width = max(1, max(len(r) for r in rows))
+		pad_id = self.tokenizer.pad_token_id or 0
+		ids = torch.full((len(rows), width), pad_id, dtype=torch.long)
+		mask = torch.zeros((len(rows), width), dtype=torch.long)
+		for i, r in enumerate(rows):
+			if r:
+				ids[i, : len(r)] = torch.as_tensor(r, dtype=torch.long)
+				mask[i, : len(r)] = 1
+		batch = {"input_ids": ids, "attention_mask": mask}
+		if self._token_type_ids:
+			# Single-segment inputs: every token belongs to segment 0
+			batch["token_type_ids"] = torch.zeros_like(ids)
+		return batch
+
+	def _forward(self, input_ids: Sequence[Sequence[int]], collect: Callable[[np.ndarray, torch.Tensor], None]) -> None:
+		"""Run every input through the model; ``collect(indices, logits)`` gets each micro-batch."""
+		n = len(input_ids)
+		lengths = np.fromiter((len(ids) for ids in input_ids), dtype=np.int64, count=n)
+		order = np.argsort(lengths, kind="stable")
+		batches = 0
+		start = time.perf_counter()
+		with self._lock, torch.inference_mode():
+			for b in range(0, n, self.batch_size):
+				idx = order[b : b + self.batch_size]
+				logits = self.model(**self._collate([input_ids[i] for i in idx])).logits
+				collect(idx, torch.as_tensor(logits).float())
+				batches += 1
+		elapsed = time.perf_counter() - start
+		stats = InferenceStats(n, int(lengths.sum()), batches, elapsed)
+		self.last_stats = stats
+		self.total_stats = InferenceStats(
+			self.total_stats.texts + stats.texts,
+			self.total_stats.tokens + stats.tokens,
+			self.total_stats.batches + stats.batches,
+			self.total_stats.seconds + stats.seconds,
+		)
+		logger.debug("Scored %d inputs (%d tokens) in %.3fs: %.0f tokens/s", n, stats.tokens, elapsed, stats.tokens_per_second)
+
+
+class SequenceClassifierEngine(_BatchedEngine):
+	"""Throughput-oriented CPU inference for a sequence classification model."""
+
+	def __init__(self, model, tokenizer, batch_size: int = 32, max_length: int = 512):
+		super().__init__(model, tokenizer, batch_size=batch_size, max_length=max_length)
+		config = getattr(model, "config", None)
+		self._sigmoid = getattr(config, "problem_type", None) == "multi_label_classification" or getattr(config, "num_labels", 2) == 1
+
+	def tokenize(self, texts: Sequence[str]) -> List[List[int]]:
+		enc = self.tokenizer(list(texts), truncation=True, max_length=self.max_length, padding=False)
+		return enc["input_ids"]
+
+	def tokenize_windows(self, texts: Sequence[str], stride: int = 0) -> Tuple[List[List[int]], List[int], List[Tuple[int, int]]]:
+		"""Split each text into ``max_length`` token windows overlapping by ``stride`` tokens.
+
+		Returns the window input ids, the index of the text each window came
+		from and each window's character span in that text. Slow tokenizers
+		have no offset mapping, so texts are truncated to a single window.
+		"""
+		texts = list(texts)
+		if not getattr(self.tokenizer, "is_fast", False):
+			return self.tokenize(texts), list(range(len(texts))), [(0, len(t)) for t in texts]
+		enc = self.tokenizer(
+			texts,
+			truncation=True,
+			max_length=self.max_length,
+			stride=max(0, min(int(stride), self.max_length // 2)),
+			return_overflowing_tokens=True,
+			return_offsets_mapping=True,
+			padding=False,
+		)
+		spans: List[Tuple[int, int]] = []
+		for offsets in enc["offset_mapping"]:
+			content = [(s, e) for s, e in offsets if e > s]
+			spans.append((content[0][0], content[-1][1]) if content else (0, 0))
+		return enc["input_ids"], list(enc["overflow_to_sample_mapping"]), spans
+
+	def predict_proba_ids(self, input_ids: Sequence[Sequence[int]]) -> np.ndarray:
+		"""Class probabilities for already-tokenized inputs, in input order."""
+		n = len(input_ids)
+		if n == 0:
+			return np.zeros((0, len(self.id2label) or 1), dtype=np.float32)
+		out: List[Optional[np.ndarray]] = [None]
+
+		def collect(idx: np.ndarray, logits: torch.Tensor) -> None:
+			probs = torch.sigmoid(logits) if self._sigmoid else torch.softmax(logits, dim=-1)
+			probs = probs.cpu().numpy()
+			if out[0] is None:
+				out[0] = np.empty((n, probs.shape[-1]), dtype=np.float32)
+			out[0][idx] = probs
+
+		self._forward(input_ids, collect)
+		return out[0]
+
+	def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+		return self.predict_proba_ids(self.tokenize(texts))
+
+	def predict(self, texts: Sequence[str]) -> List[dict]:
+		"""Top label and its probability per text (raw model label names)."""
+		probs = self.predict_proba(texts)
+		best = probs.argmax(axis=-1) if len(probs) else []
+		return [{"label": self.label_name(i), "score": float(probs[row, i])} for row, i in enumerate(best)]
+
+
+class TokenClassifierEngine(_BatchedEngine):
+	"""Batched per-token label probabilities for a token classification model."""
+
+	def predict_token_proba_ids(self, input_ids: Sequence[Sequence[int]]) -> List[np.ndarray]:
+		"""One ``(tokens, labels)`` probability array per input, in input order."""
+		out: List[Optional[np.ndarray]] = [None] * len(input_ids)
+		if not input_ids:
+			return []
+
+		def collect(idx: np.ndarray, logits: torch.Tensor) -> None:
+			probs = torch.softmax(logits, dim=-1).cpu().numpy()
+			for row, i in enumerate(idx):
+				out[i] = probs[row, : len(input_ids[i])]
+
+		self._forward(input_ids, collect)
+		return out
@@ -1,61 +1,337 @@
 from __future__ import annotations
 
-from typing import List, Tuple  
-import pandas as pd
-from datasets import load_dataset
-import feedparser
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Hashable, Iterable, Iterator, List, Tuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from .articles import Article, make_article
+from .config import AppConfig
+from .http_client import get_session
 
 
 SUPPORTED_FILE_TYPES = {".txt", ".csv"}
 
 
-def read_text_file(file_path: str) -> List[str]:
+def _iter_lines(file_path: str, use_mmap: bool) -> Iterator[str]:
+	if use_mmap and os.path.getsize(file_path) > 0:
+		with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+			for raw in iter(mm.readline, b""):
+				yield raw.decode("utf-8", errors="ignore")
+		return
 	with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-		return [line.strip() for line in f if line.strip()]
+		yield from f
+
+
+def iter_text_file(file_path: str, batch_size: int = 1000, use_mmap: bool = False) -> Iterator[List[str]]:
+	"""Yield non-empty stripped lines in batches of at most ``batch_size``.
+
+	With ``use_mmap`` the file is memory-mapped, so the OS pages it in and out
+	instead of the process buffering it.
+	"""
+	batch: List[str] = []
+	for line in _iter_lines(file_path, use_mmap):
+		line = line.strip()
+		if not line:
+			continue
+		batch.append(line)
+		if len(batch) >= batch_size:
+			yield batch
+			batch = []
+	if batch:
+		yield batch
+
+
+def read_text_file(file_path: str) -> List[str]:
+	return [line for batch in iter_text_file(file_path) for line in batch]
+
+
+def _detect_text_column(file_path: str, text_column: str | None, sample_rows: int = 200) -> str:
+	import pandas as pd
+
+	sample = pd.read_csv(file_path, nrows=sample_rows)
+	if text_column and text_column in sample.columns:
+		return text_column
+	for col in sample.columns:
+		if sample[col].dtype == object or pd.api.types.is_string_dtype(sample[col].dtype):
+			return col
+	raise ValueError("No suitable text column found in CSV")
+
+
+def iter_csv_file(file_path: str, text_column: str | None = None, chunksize: int = 10_000) -> Iterator[List[str]]:
+	"""Yield texts from one CSV column in chunks of at most ``chunksize`` rows.
+
+	Only the text column is parsed (``usecols``), read directly as strings.
+	"""
+	import pandas as pd
+
+	column = _detect_text_column(file_path, text_column)
+	reader = pd.read_csv(file_path, usecols=[column], dtype={column: str}, chunksize=max(1, chunksize))
+	for chunk in reader:
+		texts = [t for t in chunk[column].tolist() if isinstance(t, str) and t.strip()]
+		if texts:
+			yield texts
 
 
 def read_csv_file(file_path: str, text_column: str | None = None) -> List[str]:
-	df = pd.read_csv(file_path)
-	if text_column and text_column in df.columns:
-		series = df[text_column].astype(str)
+	return [t for batch in iter_csv_file(file_path, text_column) for t in batch]
+
+
+def iter_file_batches(file_path: str, batch_size: int = 1000, text_column: str | None = None, use_mmap: bool = False) -> Iterator[List[str]]:
+	"""Stream a supported file (.txt/.csv) as text batches for the analysis stages."""
+	ext = os.path.splitext(file_path)[1].lower()
+	if ext not in SUPPORTED_FILE_TYPES:
+		raise ValueError(f"Unsupported file type: {ext or file_path}")
+	if ext == ".csv":
+		return iter_csv_file(file_path, text_column, chunksize=batch_size)
+	return iter_text_file(file_path, batch_size=batch_size, use_mmap=use_mmap)
+
+
+def ag_news_snapshot_path(split: str = "train", cache_dir: str | None = None) -> str:
+	return os.path.join(cache_dir or AppConfig().ag_news_cache_dir, f"ag_news-{split}.parquet")
+
+
+def snapshot_ag_news(split: str = "train", cache_dir: str | None = None) -> str:
+	"""Download AG News once and keep only its text column as a local Parquet file."""
+	from datasets import load_dataset
+
+	path = ag_news_snapshot_path(split, cache_dir)
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	ds = load_dataset("ag_news", split=split).select_columns(["text"])
+	tmp_path = f"{path}.tmp"
+	ds.to_parquet(tmp_path)
+	os.replace(tmp_path, path)
+	return path
+
+
+def _clean_text_column(column) -> List[str]:
+	import pyarrow as pa
+	import pyarrow.compute as pc
+
+	if isinstance(column, pa.ChunkedArray):
+		column = column.combine_chunks()
+	column = pc.utf8_trim_whitespace(column.cast(pa.string()))
+	keep = pc.fill_null(pc.greater(pc.utf8_length(column), 0), False)
+	return column.filter(keep).to_pylist()
+
+
+def iter_ag_news(
+	split: str = "train",
+	batch_size: int = 1000,
+	limit: int | None = None,
+	streaming: bool = False,
+	cache_dir: str | None = None,
+) -> Iterator[List[str]]:
+	"""Yield AG News texts in batches, reading only the ``text`` column.
+
+	Uses the local Parquet snapshot when one exists (see ``snapshot_ag_news``),
+	so runs work offline. Without one, a non-streaming load writes the snapshot
+	first (it downloads the whole split anyway), while ``streaming`` reads the
+	hub dataset as a stream. Rows are sliced as Arrow record batches rather
+	than materialised one dict at a time.
+	"""
+	batch_size = max(1, int(batch_size))
+	path = ag_news_snapshot_path(split, cache_dir)
+	if not streaming and not os.path.exists(path):
+		snapshot_ag_news(split, cache_dir)
+	if os.path.exists(path):
+		import pyarrow.parquet as pq
+
+		batches = (b.column(0) for b in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=["text"]))
 	else:
-		for col in df.columns:
-			if df[col].dtype == object:
-				series = df[col].astype(str)
-				break
-		else:
-			raise ValueError("No suitable text column found in CSV")
-	return [t for t in series.tolist() if isinstance(t, str) and t.strip()]
+		from datasets import load_dataset
+
+		ds = load_dataset("ag_news", split=split, streaming=streaming).select_columns(["text"])
+		batches = (t.column("text") for t in ds.with_format("arrow").iter(batch_size=batch_size))
+	remaining = limit if limit else None
+	for column in batches:
+		texts = _clean_text_column(column)
+		if remaining is not None:
+			texts = texts[:remaining]
+			remaining -= len(texts)
+		if texts:
+			yield texts
+		if remaining is not None and remaining <= 0:
+			return
 
 
 def load_ag_news(split: str = "train", limit: int | None = 1000) -> List[str]:
-	ds = load_dataset("ag_news", split=split)
-	texts: List[str] = []
-	for row in ds:
-		text = (row.get("text") or row.get("description") or "").strip()
-		if text:
-			texts.append(text)
-		if limit and len(texts) >= limit:
-			break
-	return texts
+	"""AG News texts, read from the local snapshot when there is one.
+
+	Without a snapshot, a ``limit`` streams just that many rows from the hub
+	instead of downloading the whole split; without a limit the snapshot is
+	written first.
+	"""
+	batch_size = min(limit, 1000) if limit else 1000
+	streaming = bool(limit) and not os.path.exists(ag_news_snapshot_path(split))
+	return [t for batch in iter_ag_news(split, batch_size=batch_size, limit=limit, streaming=streaming) for t in batch]
+
+
+class FeedReport:
+	"""Outcome of polling one feed: HTTP status, latency and new entry count or error."""
+
+	__slots__ = ("url", "status", "latency", "new_entries", "error")
+
+	def __init__(self, url: str, status: int | None = None, latency: float = 0.0, new_entries: int = 0, error: str | None = None):
+		self.url = url
+		self.status = status
+		self.latency = latency
+		self.new_entries = new_entries
+		self.error = error
+
+	@property
+	def ok(self) -> bool:
+		return self.error is None
+
+	def __repr__(self) -> str:
+		return f"FeedReport(url={self.url!r}, status={self.status!r}, latency={self.latency:.3f}, new_entries={self.new_entries}, error={self.error!r})"
+
+
+def _entry_guid(entry) -> str:
+	return (entry.get("id") or entry.get("guid") or entry.get("link") or entry.get("title") or "").strip()
+
+
+def _is_http(url: str) -> bool:
+	return url.lower().startswith(("http://", "https://"))
+
+
+def _seen_key(feed_url: str, guid: str) -> Hashable:
+	# Links are globally unique; other GUIDs (often just a title) only within their feed
+	return guid if _is_http(guid) else (feed_url, guid)
+
+
+class RssIngester:
+	"""Incremental, parallel RSS/Atom poller.
+
+	Feeds are downloaded concurrently over the shared HTTP pool with bounded
+	workers. ETag/Last-Modified are kept per feed so unchanged feeds cost a 304,
+	and entry GUIDs already returned are remembered (up to ``seen_limit``) so each
+	``poll`` only yields new items. Failures are reported per feed, not skipped.
+	"""
+
+	def __init__(self, max_workers: int = 8, timeout: float = 15, limit_per_feed: int = 20, seen_limit: int = 100_000, track_seen: bool = True):
+		self.max_workers = max(1, int(max_workers))
+		self.timeout = timeout
+		self.limit_per_feed = max(0, int(limit_per_feed))
+		self.seen_limit = max(1, int(seen_limit))
+		self.track_seen = track_seen
+		self._validators: Dict[str, Tuple[str | None, str | None]] = {}
+		self._seen: "OrderedDict[Hashable, None]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def _parse(self, url: str, report: FeedReport):
+		import feedparser
+
+		if not _is_http(url):
+			# Local paths and file:// feeds: no HTTP pool or conditional requests.
+			# feedparser parses a missing path as the literal string and reports
+			# it as malformed XML, so check for the file first
+			path = url2pathname(urlparse(url).path) if url.lower().startswith("file://") else url
+			if not os.path.isfile(path):
+				raise FileNotFoundError(f"feed file not found: {path}")
+			return feedparser.parse(path)
+		headers: Dict[str, str] = {}
+		with self._lock:
+			etag, modified = self._validators.get(url, (None, None))
+		if self.track_seen:
+			if etag:
+				headers["If-None-Match"] = etag
+			if modified:
+				headers["If-Modified-Since"] = modified
+		resp = get_session().get(url, headers=headers, timeout=self.timeout)
+		report.status = resp.status_code
+		if resp.status_code == 304:
+			return None
+		resp.raise_for_status()
+		feed = feedparser.parse(resp.content, response_headers={"content-location": url, "content-type": resp.headers.get("Content-Type", "")})
+		if not (feed.get("bozo") and not feed.entries):
+			with self._lock:
+				self._validators[url] = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+		return feed
+
+	def _fetch(self, url: str) -> Tuple[FeedReport, List[Tuple[Hashable, Article]]]:
+		report = FeedReport(url)
+		start = time.perf_counter()
+		try:
+			feed = self._parse(url, report)
+			if feed is None:
+				return report, []
+			if feed.get("bozo") and not feed.entries:
+				raise ValueError(f"unparseable feed: {feed.get('bozo_exception')}")
+			source = (feed.feed.get("title") or "").strip()
+			items: List[Tuple[Hashable, Article]] = []
+			for entry in feed.entries[: self.limit_per_feed]:
+				article = make_article(
+					entry.get("title"),
+					entry.get("summary") or entry.get("description"),
+					entry.get("link"),
+					source=source,
+					published_at=entry.get("published") or entry.get("updated"),
+				)
+				if article is not None:
+					items.append((_seen_key(url, _entry_guid(entry) or article.id), article))
+			return report, items
+		except Exception as e:
+			report.error = str(e) or e.__class__.__name__
+			return report, []
+		finally:
+			report.latency = time.perf_counter() - start
+
+	def _mark_seen(self, guid: Hashable) -> bool:
+		"""Record ``guid``; return False if it was already seen."""
+		if guid in self._seen:
+			self._seen.move_to_end(guid)
+			return False
+		self._seen[guid] = None
+		while len(self._seen) > self.seen_limit:
+			self._seen.popitem(last=False)
+		return True
+
+	def poll(self, feed_urls: Iterable[str]) -> Tuple[List[Article], List[FeedReport]]:
+		urls = list(dict.fromkeys(u for u in feed_urls if u))
+		if not urls:
+			return [], []
+		workers = min(self.max_workers, len(urls))
+		with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rss-fetch") as pool:
+			outcomes = list(pool.map(self._fetch, urls))
+		articles: List[Article] = []
+		reports: List[FeedReport] = []
+		batch_seen = set()
+		with self._lock:
+			for report, items in outcomes:
+				for guid, article in items:
+					if guid in batch_seen:
+						continue
+					batch_seen.add(guid)
+					if self.track_seen and not self._mark_seen(guid):
+						continue
+					articles.append(article)
+					report.new_entries += 1
+				reports.append(report)
+		return articles, reports
 
 
 def fetch_rss_texts(feed_urls: List[str], limit_per_feed: int = 20) -> List[str]:
 	"""Fetch latest entries from RSS/Atom feeds and return combined texts.
 
-	Combines title + summary/content where available.
+	Combines title + summary/content where available. Stateless: every call
+	returns all current entries; use ``RssIngester`` for incremental polling.
 	"""
-	collected: List[str] = []
-	for url in feed_urls:
-		try:
-			feed = feedparser.parse(url)
-			for entry in feed.entries[: max(0, limit_per_feed)]:
-				title = (getattr(entry, "title", "") or "").strip()
-				summary = (getattr(entry, "summary", "") or getattr(entry, "description", "") or "").strip()
-				content = f"{title}. {summary}".strip(". ")
-				if content:
-					collected.append(content)
-		except Exception:
-			continue
-	return collected
+	articles, _ = RssIngester(limit_per_feed=limit_per_feed, track_seen=False).poll(feed_urls)
+	return [a.content for a in articles if a.content]
+
+
+def main(argv=None) -> None:
+	import argparse
 
+	parser = argparse.ArgumentParser(description="Write the local AG News snapshot used by iter_ag_news.")
+	parser.add_argument("--split", action="append", help="dataset split (repeatable, default: train and test)")
+	parser.add_argument("--cache-dir", default=None)
+	args = parser.parse_args(argv)
+	for split in args.split or ["train", "test"]:
+		print(snapshot_ag_news(split, args.cache_dir))
@@ -1,50 +1,148 @@
 from __future__ import annotations
 
-from typing import Dict, List
-
-import spacy
-from transformers import AutoModelForTokenClassification, AutoTokenizer, TokenClassificationPipeline
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 
+from .analysis import iter_analyze_texts
+from .backends import check_backend, load_token_classifier, model_id
 from .config import AppConfig
+from .preprocessing import load_spacy_model
+from .registry import get_registry
+from .result_cache import cached_map
+
+
+if TYPE_CHECKING:
+	import spacy
+	from transformers import TokenClassificationPipeline
+
+	from .inference import TokenClassifierEngine
+
+
+HF_ENTITY_LABELS = {"PER", "ORG", "LOC"}
 
 
 def get_spacy_ner() -> spacy.language.Language:
-	try:
-		return spacy.load("en_core_web_sm")
-	except OSError:
-		from spacy.cli import download
-		download("en_core_web_sm")
-		return spacy.load("en_core_web_sm")
+	# The same shared pipeline the analysis stage uses, not a second copy
+	return load_spacy_model()
+
 
+def _load_hf_ner(model_name: str, backend: str = "torch") -> TokenClassificationPipeline:
+	from transformers import TokenClassificationPipeline
 
-_HF_NER: TokenClassificationPipeline | None = None
+	model, tokenizer = load_token_classifier(model_name, backend)
+	return TokenClassificationPipeline(model=model, tokenizer=tokenizer, aggregation_strategy="simple")
 
 
 def get_hf_ner() -> TokenClassificationPipeline:
-	global _HF_NER
-	if _HF_NER is not None:
-		return _HF_NER
-	model_name = AppConfig().ner_hf_model
-	tokenizer = AutoTokenizer.from_pretrained(model_name)
-	model = AutoModelForTokenClassification.from_pretrained(model_name)
-	_HF_NER = TokenClassificationPipeline(model=model, tokenizer=tokenizer, aggregation_strategy="simple")
-	return _HF_NER
-
-
-def extract_entities_spacy(texts: List[str]) -> List[List[Dict]]:
-	nlp = get_spacy_ner()
-	results: List[List[Dict]] = []
-	for t in texts:
-		doc = nlp(t)
-		ents: List[Dict] = []
-		for ent in doc.ents:
-			if ent.label_ in {"PERSON", "ORG", "GPE", "LOC"}:
-				ents.append({"text": ent.text, "label": ent.label_, "start": ent.start_char, "end": ent.end_char})
-		results.append(ents)
-	return results
+	cfg = AppConfig()
+	model_name = cfg.ner_hf_model
+	backend = check_backend(cfg.ner_backend)
+	return get_registry().get(("hf-ner", model_name, backend), lambda: _load_hf_ner(model_name, backend))
+
+
+def extract_entities_spacy(texts: Iterable[str], batch_size: Optional[int] = None, n_process: Optional[int] = None) -> List[List[Dict]]:
+	# Thin view over the single-pass spaCy stage
+	return [r.entities for r in iter_analyze_texts(texts, batch_size=batch_size, n_process=n_process)]
+
+
+def get_hf_ner_engine() -> TokenClassifierEngine:
+	cfg = AppConfig()
+	backend = check_backend(cfg.ner_backend)
+
+	def build() -> TokenClassifierEngine:
+		from .inference import TokenClassifierEngine, configure_torch_threads
+
+		configure_torch_threads()
+		pipeline = get_hf_ner()
+		return TokenClassifierEngine(pipeline.model, pipeline.tokenizer, batch_size=cfg.ner_batch_size, max_length=cfg.ner_max_length)
+
+	return get_registry().get(("hf-ner-engine", cfg.ner_hf_model, backend), build)
 
 
 def extract_entities_hf(texts: List[str]) -> List[List[Dict]]:
+	cfg = AppConfig()
+	# Window size and overlap change the entities found, so they are part of the cache key
+	kind = f"hf-ner:{cfg.ner_max_length}:{cfg.ner_stride}"
+	return cached_map(kind, model_id(cfg.ner_hf_model, cfg.ner_backend), list(texts), _extract_entities_hf_uncached)
+
+
+def _extract_entities_hf_uncached(texts: List[str]) -> List[List[Dict]]:
+	engine = get_hf_ner_engine()
+	if not getattr(engine.tokenizer, "is_fast", False):
+		# Slow tokenizers have no offset mapping; fall back to one truncated call per text
+		return _extract_entities_hf_pipeline(texts)
+	cfg = AppConfig()
+	enc = engine.tokenizer(
+		list(texts),
+		truncation=True,
+		max_length=engine.max_length,
+		stride=max(0, min(cfg.ner_stride, engine.max_length // 2)),
+		return_overflowing_tokens=True,
+		return_offsets_mapping=True,
+		return_special_tokens_mask=True,
+		padding=False,
+	)
+	windows = enc["input_ids"]
+	probs = engine.predict_token_proba_ids(windows)
+	owners = enc["overflow_to_sample_mapping"]
+
+	# Per text: (start, end) -> (distance from window edge, label id, score); in the
+	# overlap between windows the prediction with more context on both sides wins.
+	tokens: List[Dict[Tuple[int, int], Tuple[float, int, float]]] = [{} for _ in texts]
+	window_count = [0] * len(texts)
+	for owner in owners:
+		window_count[owner] += 1
+	seen = [0] * len(texts)
+	for w, owner in enumerate(owners):
+		position = seen[owner]
+		seen[owner] += 1
+		content = [i for i, special in enumerate(enc["special_tokens_mask"][w]) if not special]
+		last = len(content) - 1
+		labels = probs[w].argmax(axis=-1)
+		for rank, i in enumerate(content):
+			start, end = enc["offset_mapping"][w][i]
+			if end <= start:
+				continue
+			left = rank if position > 0 else float("inf")
+			right = last - rank if position < window_count[owner] - 1 else float("inf")
+			distance = min(left, right)
+			current = tokens[owner].get((start, end))
+			if current is None or distance > current[0]:
+				label = int(labels[i])
+				tokens[owner][(start, end)] = (distance, label, float(probs[w][i, label]))
+
+	return [_merge_token_labels(text, found, engine) for text, found in zip(texts, tokens)]
+
+
+def _merge_token_labels(text: str, found: Dict[Tuple[int, int], Tuple[float, int, float]], engine: TokenClassifierEngine) -> List[Dict]:
+	"""Group B-/I- tagged tokens into entity spans (like the pipeline's "simple" strategy)."""
+	entities: List[Dict] = []
+	current: Optional[Dict] = None
+	scores: List[float] = []
+
+	def close():
+		if current is not None and current["label"] in HF_ENTITY_LABELS:
+			current["score"] = float(sum(scores) / len(scores))
+			current["text"] = text[current["start"] : current["end"]]
+			entities.append(current)
+
+	for (start, end), (_, label_id, score) in sorted(found.items()):
+		tag = engine.label_name(label_id)
+		prefix, _, kind = tag.rpartition("-") if "-" in tag else ("I", "", tag)
+		if tag == "O" or kind == "O":
+			close()
+			current, scores = None, []
+			continue
+		if current is not None and prefix != "B" and kind == current["label"]:
+			current["end"] = end
+			scores.append(score)
+			continue
+		close()
+		current, scores = {"text": "", "label": kind, "score": 0.0, "start": start, "end": end}, [score]
+	close()
+	return entities
+
+
+def _extract_entities_hf_pipeline(texts: List[str]) -> List[List[Dict]]:
 	pipeline = get_hf_ner()
 	results: List[List[Dict]] = []
 	for t in texts:
@@ -52,8 +150,7 @@ def extract_entities_hf(texts: List[str]) -> List[List[Dict]]:
 		filtered = [
 			{"text": p.get("word"), "label": p.get("entity_group"), "score": float(p.get("score", 0.0)), "start": p.get("start"), "end": p.get("end")}
 			for p in preds
-			if p.get("entity_group") in {"PER", "ORG", "LOC"}
+			if p.get("entity_group") in HF_ENTITY_LABELS
 		]
 		results.append(filtered)
 	return results
-
@@ -2,10 +2,17 @@ from __future__ import annotations
 
 import os
 import time
-from typing import List, Literal, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Literal, Dict, Tuple
 
 import requests
 
+from .articles import Article, iter_gnews_articles
+from .config import AppConfig
+from .http_client import conditional_get
+from .rate_limit import RateLimitExceeded, get_gnews_bucket, parse_retry_after
+from .response_cache import get_response_cache
+
 
 Category = Literal[
     "entertainment",
@@ -24,6 +31,17 @@ class NewsApiError(Exception):
     pass
 
 
+class RateLimitedError(NewsApiError):
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _gnews_base_url() -> str:
+    # Overridable so tests and the ingestion daemon can target a local fake server
+    return AppConfig().gnews_base_url.rstrip("/")
+
+
 def _map_category_for_gnews(category: Category) -> str:
     # GNews categories: general, world, nation, business, technology, entertainment, sports, science, health
     if category == "finance":
@@ -34,19 +52,24 @@ def _map_category_for_gnews(category: Category) -> str:
     return "entertainment"
 
 
-def _request_with_retry(url: str, params: Dict, max_attempts: int = 4, base_delay: float = 1.0) -> requests.Response:
+def _request_with_retry(url: str, params: Dict, max_attempts: int = 3, base_delay: float = 0.5) -> requests.Response:
+    # Every attempt draws from the shared GNews token bucket. A 429 is never
+    # slept on here: it blocks the bucket for Retry-After and fails fast.
+    bucket = get_gnews_bucket()
+    max_wait = AppConfig().gnews_max_wait
     attempt = 0
     last_exc: Exception | None = None
     while attempt < max_attempts:
         try:
-            resp = requests.get(url, params=params, timeout=15)
-            # Handle explicit 429 with Retry-After if present
+            bucket.acquire(timeout=max_wait)
+        except RateLimitExceeded as e:
+            raise RateLimitedError(_rate_limit_message(e.retry_after, f"GNews client limit: {e}."), e.retry_after)
+        try:
+            resp = conditional_get(url, params, timeout=15)
             if resp.status_code == 429:
-                retry_after = resp.headers.get("Retry-After")
-                delay = float(retry_after) if retry_after and retry_after.isdigit() else base_delay * (2 ** attempt)
-                time.sleep(min(delay, 10.0))
-                attempt += 1
-                continue
+                exc = _rate_limited(resp)
+                bucket.note_retry_after(exc.retry_after)
+                raise exc
             resp.raise_for_status()
             return resp
         except requests.RequestException as e:
@@ -55,20 +78,53 @@ def _request_with_retry(url: str, params: Dict, max_attempts: int = 4, base_dela
             status = getattr(getattr(e, 'response', None), 'status_code', None)
             if status and status < 500:
                 break
-            time.sleep(min(base_delay * (2 ** attempt), 10.0))
             attempt += 1
+            if attempt < max_attempts:
+                time.sleep(min(base_delay * (2 ** (attempt - 1)), 2.0))
     if last_exc:
         raise last_exc
     raise requests.RequestException("Request failed without exception")
 
 
+def _rate_limit_message(retry_after: float | None, reason: str = "GNews rate limit reached.") -> str:
+    if retry_after:
+        return f"{reason} Please try again in {int(retry_after) + 1} s."
+    return f"{reason} Please try again in a moment."
+
+
+def _rate_limited(resp: requests.Response) -> RateLimitedError:
+    retry_after = parse_retry_after(resp.headers.get("Retry-After"), default=60.0)
+    return RateLimitedError(_rate_limit_message(retry_after), retry_after)
+
+
+def gnews_budget() -> Dict[str, float]:
+    """Remaining GNews request budget shared by all sessions on this host."""
+    return get_gnews_bucket().status()
+
+
+def _is_transient(exc: Exception) -> bool:
+    # Errors for which a cached (even expired) payload is better than nothing
+    if isinstance(exc, RateLimitedError):
+        return True
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def _fetch_payload(url: str, params: Dict) -> bytes:
+    return get_response_cache().get_or_fetch(
+        url, params, lambda: _request_with_retry(url, params).content, _is_transient,
+    )
+
+
 def fetch_gnews(category: Category, limit: int = 20, api_key: str | None = None) -> List[str]:
     key = api_key or os.getenv("GNEWS_API_KEY", "").strip()
     if not key:
         raise NewsApiError("GNEWS_API_KEY is not configured")
 
     mapped_category = _map_category_for_gnews(category)
-    url = "https://gnews.io/api/v4/top-headlines"
+    url = f"{_gnews_base_url()}/top-headlines"
     params = {
         "token": key,
         "lang": "en",
@@ -77,20 +133,14 @@ def fetch_gnews(category: Category, limit: int = 20, api_key: str | None = None)
     }
 
     try:
-        resp = _request_with_retry(url, params)
-        data = resp.json() or {}
-        articles = data.get("articles", []) or []
-        texts: List[str] = []
-        for a in articles:
-            title = (a.get("title") or "").strip()
-            desc = (a.get("description") or "").strip()
-            content = f"{title}. {desc}".strip(". ")
-            if content:
-                texts.append(content)
+        payload = _fetch_payload(url, params)
+        texts = [a.content for a in iter_gnews_articles(payload) if a.content]
         if not texts:
             raise NewsApiError("No articles returned from GNews")
         return texts
     except requests.RequestException as e:
+        if getattr(e, 'response', None) is not None and e.response.status_code == 429:
+            raise _rate_limited(e.response)
         raise NewsApiError(f"GNews request failed: {e}")
     except ValueError:
         raise NewsApiError("GNews returned invalid JSON")
@@ -104,13 +154,13 @@ def fetch_live_news(provider: Literal["gnews", "gdelt"], category: Category, lim
     return fetch_gnews(category, limit)
 
 
-def fetch_gnews_articles(category: Category, limit: int = 20, api_key: str | None = None) -> List[Dict]:
+def fetch_gnews_articles(category: Category, limit: int = 20, api_key: str | None = None) -> List[Article]:
     key = api_key or os.getenv("GNEWS_API_KEY", "").strip()
     if not key:
         raise NewsApiError("GNEWS_API_KEY is not configured")
 
     mapped_category = _map_category_for_gnews(category)
-    url = "https://gnews.io/api/v4/top-headlines"
+    url = f"{_gnews_base_url()}/top-headlines"
     params = {
         "token": key,
         "lang": "en",
@@ -119,35 +169,15 @@ def fetch_gnews_articles(category: Category, limit: int = 20, api_key: str | Non
     }
 
     try:
-        resp = _request_with_retry(url, params)
-        data = resp.json() or {}
-        articles = data.get("articles", []) or []
-        items: List[Dict] = []
-        for a in articles:
-            title = (a.get("title") or "").strip()
-            description = (a.get("description") or "").strip()
-            url_ = (a.get("url") or "").strip()
-            image = (a.get("image") or "").strip()
-            source = ((a.get("source") or {}).get("name") or "").strip()
-            content = ". ".join([p for p in [title, description] if p]).strip(". ")
-            if title or description:
-                items.append({
-                    "id": url_ or title,
-                    "title": title,
-                    "description": description,
-                    "image": image,
-                    "url": url_,
-                    "source": source,
-                    "content": content,
-                })
+        payload = _fetch_payload(url, params)
+        items = list(iter_gnews_articles(payload))
         if not items:
             raise NewsApiError("No articles returned from GNews")
         return items
     except requests.RequestException as e:
-        # Provide a friendlier message for rate limiting
-        status = getattr(getattr(e, 'response', None), 'status_code', None)
-        if status == 429:
-            raise NewsApiError("GNews rate limit reached. Please try again in a moment.")
+        # Provide a friendlier message for rate limiting, with the wait GNews asked for
+        if getattr(e, 'response', None) is not None and e.response.status_code == 429:
+            raise _rate_limited(e.response)
         raise NewsApiError(f"GNews request failed: {e}")
     except ValueError:
         raise NewsApiError("GNews returned invalid JSON")
@@ -156,20 +186,49 @@ def fetch_gnews_articles(category: Category, limit: int = 20, api_key: str | Non
 # GDELT article support removed
 
 
-def fetch_live_news_articles(provider: Literal["gnews", "gdelt"], category: Category, limit: int = 20) -> List[Dict]:
+def fetch_live_news_articles(provider: Literal["gnews", "gdelt"], category: Category, limit: int = 20) -> List[Article]:
     # Backwards-compatible signature; provider ignored, only GNews used
     return fetch_gnews_articles(category, limit)
 
-def fetch_news_category(category: Category, limit: int = 20) -> List[Dict]:
+def fetch_news_category(category: Category, limit: int = 20) -> List[Article]:
     return fetch_gnews_articles(category, limit)
 
 
-def search_gnews(query: str, limit: int = 20, api_key: str | None = None) -> List[Dict]:
+def fetch_news_categories(
+    categories: Iterable[Category],
+    limit: int = 20,
+    max_workers: int | None = None,
+) -> Tuple[Dict[str, List[Article]], Dict[str, str]]:
+    """Fetch several categories concurrently.
+
+    Returns ``(results, errors)``: articles per category that succeeded and an
+    error message per category that failed, so one failure does not discard
+    the rest of the batch.
+    """
+    cats = list(dict.fromkeys(categories))
+    results: Dict[str, List[Article]] = {}
+    errors: Dict[str, str] = {}
+    if not cats:
+        return results, errors
+    workers = max(1, min(max_workers or len(cats), len(cats)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gnews-fetch") as pool:
+        futures = {cat: pool.submit(fetch_news_category, cat, limit) for cat in cats}
+        for cat, fut in futures.items():
+            try:
+                results[cat] = fut.result()
+            except NewsApiError as e:
+                errors[cat] = str(e)
+            except Exception as e:
+                errors[cat] = f"GNews request failed: {e}"
+    return results, errors
+
+
+def search_gnews(query: str, limit: int = 20, api_key: str | None = None) -> List[Article]:
     key = api_key or os.getenv("GNEWS_API_KEY", "").strip()
     if not key:
         raise NewsApiError("GNEWS_API_KEY is not configured")
 
-    url = "https://gnews.io/api/v4/search"
+    url = f"{_gnews_base_url()}/search"
     params = {
         "token": key,
         "lang": "en",
@@ -178,34 +237,14 @@ def search_gnews(query: str, limit: int = 20, api_key: str | None = None) -> Lis
     }
 
     try:
-        resp = _request_with_retry(url, params)
-        data = resp.json() or {}
-        articles = data.get("articles", []) or []
-        items: List[Dict] = []
-        for a in articles:
-            title = (a.get("title") or "").strip()
-            description = (a.get("description") or "").strip()
-            url_ = (a.get("url") or "").strip()
-            image = (a.get("image") or "").strip()
-            source = ((a.get("source") or {}).get("name") or "").strip()
-            content = ". ".join([p for p in [title, description] if p]).strip(". ")
-            if title or description:
-                items.append({
-                    "id": url_ or title,
-                    "title": title,
-                    "description": description,
-                    "image": image,
-                    "url": url_,
-                    "source": source,
-                    "content": content,
-                })
+        payload = _fetch_payload(url, params)
+        items = list(iter_gnews_articles(payload))
         if not items:
             raise NewsApiError("No results returned from GNews search")
         return items
     except requests.RequestException as e:
-        status = getattr(getattr(e, 'response', None), 'status_code', None)
-        if status == 429:
-            raise NewsApiError("GNews rate limit reached. Please try again in a moment.")
+        if getattr(e, 'response', None) is not None and e.response.status_code == 429:
+            raise _rate_limited(e.response)
         raise NewsApiError(f"GNews search failed: {e}")
     except ValueError:
         raise NewsApiError("GNews returned invalid JSON")
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional
 
 import streamlit as st
 
-from .news_api import fetch_news_category, NewsApiError, search_gnews
-from .sentiment import predict_sentiment
-from .preprocessing import preprocess_texts, compute_top_frequencies, compute_top_bigrams
-from .ner import extract_entities_spacy
-from .viz import plotly_sentiment_distribution, plotly_word_frequencies, entities_count_table, plotly_bigrams, plotly_entity_labels
+from .config import AppConfig
+from .dedup import dedupe_articles
+from .news_api import fetch_news_categories, gnews_budget, NewsApiError, search_gnews
+from .store import get_article_store
+from .sentiment import predict_document_sentiment
+from .analysis import analyze_texts
+from .aggregate import IncrementalAggregator, overall_analysis
+from .preprocessing import compute_top_frequencies, compute_top_bigrams
+from .viz import plotly_sentiment_counts, plotly_word_frequencies, plotly_bigrams, plotly_entity_label_counts
 
 # Safe optional import for Gemini helper
 try:
@@ -20,26 +25,48 @@ except Exception:
 		pass
 
 
+def _load_from_store(categories: List[str], max_age: Optional[float] = None) -> Dict[str, List[Dict]]:
+	# Articles written by the ingestion daemon (newspulse_pkg.daemon), if configured.
+	# With max_age, only categories the daemon polled within the last max_age seconds
+	try:
+		store = get_article_store()
+		if store is None:
+			return {}
+		if max_age is not None:
+			cutoff = time.time() - max_age
+			polled = store.polled_at(categories)
+			categories = [cat for cat in categories if polled.get(cat, 0.0) >= cutoff]
+		stored = store.latest_by_category(categories, 20)
+	except Exception:
+		return {}
+	return {cat: arts for cat, arts in stored.items() if arts}
+
+
+def _set_articles(articles: Dict[str, List[Dict]]):
+	deduped = dedupe_articles(articles)
+	st.session_state["news_articles"] = deduped.groups
+	st.session_state["news_duplicates"] = deduped.duplicates
+
+
 def _ensure_state():
 	if "news_articles" not in st.session_state:
-		st.session_state["news_articles"] = {
-			"entertainment": [],
-			"finance": [],
-			"sports": [],
-			"technology": [],
-		}
+		categories = ["entertainment", "finance", "sports", "technology"]
+		stored = _load_from_store(categories)
+		_set_articles({cat: stored.get(cat, []) for cat in categories})
 	if "news_search_results" not in st.session_state:
 		st.session_state["news_search_results"] = []
 	if "news_search_query" not in st.session_state:
 		st.session_state["news_search_query"] = ""
 	if "news_article_sentiments" not in st.session_state:
 		st.session_state["news_article_sentiments"] = {}
-	if "news_overall_sentiments" not in st.session_state:
-		st.session_state["news_overall_sentiments"] = []
+	if "news_overall" not in st.session_state:
+		st.session_state["news_overall"] = None
 	if "open_article_analysis" not in st.session_state:
 		st.session_state["open_article_analysis"] = None
 	if "article_chatbot_answers" not in st.session_state:
 		st.session_state["article_chatbot_answers"] = {}
+	if "news_duplicates" not in st.session_state:
+		st.session_state["news_duplicates"] = {}
 
 
 def _section_header(title: str, subtitle: str | None = None):
@@ -63,13 +90,12 @@ def _section_header(title: str, subtitle: str | None = None):
 
 def _render_overall_summary():
 	_section_header("📊 Overall Analysis", "Run analysis to see the current batch trends.")
-	sentiments = st.session_state.get("news_overall_sentiments", [])
-	overall_freq = st.session_state.get("news_overall_freq", [])
-	overall_entities = st.session_state.get("news_overall_entities", [])
+	overall = st.session_state.get("news_overall")
+	overall_freq = list(overall.frequencies) if overall else []
 	col1, col2 = st.columns(2)
 	with col1:
-		if sentiments:
-			fig = plotly_sentiment_distribution(sentiments)
+		if overall and overall.sentiment_counts:
+			fig = plotly_sentiment_counts(overall.sentiment_counts)
 			if fig:
 				st.plotly_chart(fig, use_container_width=True, key="overall_sentiment_chart")
 		else:
@@ -84,23 +110,19 @@ def _render_overall_summary():
 	# Advanced: bigrams and entity label distribution
 	adv1, adv2 = st.columns(2)
 	with adv1:
-		if overall_freq:
-			arts = st.session_state.get("news_articles", {})
-			texts = [a.get("content") or a.get("description") or a.get("title") for v in arts.values() for a in v]
-			texts = [t for t in texts if t]
-			pp = preprocess_texts(texts)
-			bigrams = compute_top_bigrams([r["tokens"] for r in pp], top_k=20)
+		bigrams = list(overall.bigrams) if overall else []
+		if overall_freq and bigrams:
 			figb = plotly_bigrams(bigrams)
 			if figb:
 				st.plotly_chart(figb, use_container_width=True, key="overall_bigrams_chart")
 	with adv2:
-		if overall_entities:
-			fige = plotly_entity_labels(overall_entities)
+		if overall and overall.entity_counts:
+			fige = plotly_entity_label_counts(overall.entity_label_counts())
 			if fige:
 				st.plotly_chart(fige, use_container_width=True, key="overall_entity_labels_chart")
-	if overall_entities:
+	if overall and overall.entity_counts:
 		st.markdown("### 🏷 Entities (Top)")
-		tbl = entities_count_table(overall_entities)
+		tbl = overall.entity_table()
 		st.dataframe(tbl.head(50), use_container_width=True)
 
 
@@ -109,19 +131,23 @@ def _update_overall_sentiment():
 	arts = st.session_state.get("news_articles", {})
 	for cat, lst in arts.items():
 		all_articles.extend(lst)
-	contents = [a.get("content") or a.get("description") or a.get("title") for a in all_articles]
-	contents = [c for c in contents if c]
-	if not contents:
-		st.session_state["news_overall_sentiments"] = []
-		st.session_state["news_overall_freq"] = []
-		st.session_state["news_overall_entities"] = []
+	# Shared across sessions per batch; on a miss only articles added (or
+	# changed) since this session's last run are analyzed
+	aggregator = st.session_state.setdefault("news_overall_aggregator", IncrementalAggregator())
+	st.session_state["news_overall"] = overall_analysis(all_articles, aggregator)
+
+
+def _render_api_budget():
+	try:
+		budget = gnews_budget()
+	except Exception:
 		return
-	pp = preprocess_texts(contents)
-	tokens_list = [r["tokens"] for r in pp]
-	st.session_state["news_overall_freq"] = compute_top_frequencies(tokens_list, top_k=25)
-	ents = extract_entities_spacy([r["raw"] for r in pp])
-	st.session_state["news_overall_entities"] = ents
-	st.session_state["news_overall_sentiments"] = predict_sentiment([r["clean"] or r["raw"] for r in pp])
+	if not budget.get("daily_limit"):
+		return
+	msg = f"GNews budget: {int(budget['remaining_today'])}/{int(budget['daily_limit'])} requests left today"
+	if budget.get("blocked_for"):
+		msg += f" · rate limited for {int(budget['blocked_for']) + 1} s"
+	st.caption(msg)
 
 
 def _render_article_card(article: Dict, category: str, index: int):
@@ -146,15 +172,19 @@ def _render_article_card(article: Dict, category: str, index: int):
 			meta = " | ".join([part for part in [source, url_] if part])
 			if meta:
 				st.caption(meta)
+			dupes = st.session_state.get("news_duplicates", {}).get(article_id, [])
+			also_in = sorted({cat for cat, _ in dupes if cat != category})
+			if also_in:
+				st.caption(f"🔁 Also in: {', '.join(also_in)}")
 			if st.button("🔎 Analyze", key=f"sent_{category}_{index}"):
 				text = (article.get("content") or description or title)
 				if text:
-					res = predict_sentiment([text])[0]
-					pp = preprocess_texts([text])
-					tokens = pp[0]["tokens"] if pp else []
+					res = predict_document_sentiment([text])[0]
+					doc = analyze_texts([text])[0]
+					tokens = doc.tokens
 					freq = compute_top_frequencies([tokens], top_k=15)
 					bigrams = compute_top_bigrams([tokens], top_k=10)
-					ents = extract_entities_spacy([text])[0]
+					ents = doc.entities
 					st.session_state["news_article_sentiments"][article_id] = res
 					st.session_state["open_article_analysis"] = {
 						"title": title,
@@ -171,6 +201,9 @@ def _render_article_card(article: Dict, category: str, index: int):
 						label = str(data["sent"].get("label", "")).capitalize()
 						score = float(data["sent"].get("score", 0.0))
 						st.markdown(f"**Sentiment:** {label} ({score:.2f})")
+						windows = data["sent"].get("windows") or []
+						if len(windows) > 1:
+							st.caption(f"Scored over {len(windows)} windows: " + ", ".join(f"{w['label']} {w['score']:.2f}" for w in windows))
 						ents = data.get("ents") or []
 						if ents:
 							st.markdown("#### 🏷 Entities")
@@ -225,17 +258,28 @@ def render_live_news_space():
 		if st.button("⚡ Fetch Articles", key="btn_fetch", use_container_width=True):
 			try:
 				categories = list(st.session_state["news_articles"].keys())
-				fetched: Dict[str, List[Dict]] = {}
-				for cat in categories:
-					fetched[cat] = fetch_news_category(cat, 20)
-				st.session_state["news_articles"] = fetched
+				fetched = _load_from_store(categories, max_age=AppConfig().article_store_max_age)
+				missing = [cat for cat in categories if cat not in fetched]
+				errors: Dict[str, str] = {}
+				if missing:
+					live, errors = fetch_news_categories(missing, 20)
+					fetched.update(live)
+					if errors:
+						# Stale stored articles beat an empty category
+						stale = _load_from_store([cat for cat in errors if cat not in fetched])
+						fetched.update(stale)
+				if not fetched:
+					raise NewsApiError(next(iter(errors.values()), "No articles returned from GNews"))
+				_set_articles({cat: fetched.get(cat, []) for cat in categories})
 				st.session_state["news_article_sentiments"] = {}
-				st.session_state["news_overall_sentiments"] = []
-				st.session_state["news_overall_freq"] = []
-				st.session_state["news_overall_entities"] = []
+				st.session_state["news_overall"] = None
 				st.session_state["open_article_analysis"] = None
 				st.session_state["news_search_results"] = []
-				st.success("✅ Fetched latest articles for all categories.")
+				if errors:
+					failed = ", ".join(f"{cat} ({msg})" for cat, msg in errors.items())
+					st.warning(f"⚠️ Some categories could not be fetched: {failed}")
+				else:
+					st.success("✅ Fetched latest articles for all categories.")
 			except NewsApiError as e:
 				st.error(str(e))
 			except Exception as e:
@@ -243,6 +287,7 @@ def render_live_news_space():
 	with analyze_col:
 		if st.button("📊 Run Overall Analysis", key="btn_overall", use_container_width=True):
 			_update_overall_sentiment()
+	_render_api_budget()
 
 	_render_overall_summary()
 
@@ -257,7 +302,7 @@ def render_live_news_space():
 			if st.button("Search", key="btn_search", use_container_width=True):
 				if query and query.strip():
 					try:
-						results = search_gnews(query.strip(), 20)
+						results = dedupe_articles({"search": search_gnews(query.strip(), 20)}).groups["search"]
 						st.session_state["news_search_results"] = results
 						st.session_state["open_article_analysis"] = None
 						st.success(f"🔍 Found {len(results)} results for '{query.strip()}'.")
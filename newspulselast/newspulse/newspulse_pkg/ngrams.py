@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class Vocabulary:
+	"""Token <-> integer id mapping; ids are assigned in first-seen order.
+
+	The empty string is never added and encodes as -1, which n-gram counting
+	treats as a break (matching ``compute_top_bigrams``, which skips empty tokens).
+	"""
+
+	def __init__(self, tokens: Iterable[str] = ()):
+		self._index: Dict[str, int] = {}
+		self._tokens: List[str] = []
+		for t in tokens:
+			self.add(t)
+
+	def __len__(self) -> int:
+		return len(self._tokens)
+
+	def __contains__(self, token: str) -> bool:
+		return token in self._index
+
+	def add(self, token: str) -> int:
+		if not token:
+			return -1
+		i = self._index.get(token)
+		if i is None:
+			i = self._index[token] = len(self._tokens)
+			self._tokens.append(token)
+		return i
+
+	def id(self, token: str) -> int:
+		return self._index.get(token, -1)
+
+	def token(self, i: int) -> str:
+		return self._tokens[i]
+
+	def tokens(self) -> List[str]:
+		return list(self._tokens)
+
+	def encode(self, tokens: Iterable[str], grow: bool = True) -> np.ndarray:
+		"""Ids for ``tokens`` as int32; unknown tokens are added (or -1 when ``grow`` is False)."""
+		index = self._index
+		if grow:
+			before = len(self._tokens)
+			# setdefault evaluates len(index) before inserting, so new ids are dense
+			ids = [index.setdefault(t, len(index)) if t else -1 for t in tokens]
+			if len(index) > before:
+				self._tokens.extend(list(index)[before:])
+		else:
+			ids = [index.get(t, -1) if t else -1 for t in tokens]
+		return np.asarray(ids, dtype=np.int32)
+
+
+def _codes(ids: np.ndarray, doc: np.ndarray, n: int, base: int) -> Tuple[np.ndarray, np.ndarray]:
+	"""int64 code of every valid n-gram (same document, no break token) and its start position."""
+	if ids.size < n:
+		return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+	span = ids.size - n + 1
+	valid = doc[:span] == doc[n - 1 :]
+	codes = np.zeros(span, dtype=np.int64)
+	for k in range(n):
+		part = ids[k : k + span]
+		valid &= part >= 0
+		codes = codes * base + part
+	positions = np.flatnonzero(valid)
+	return codes[positions], positions
+
+
+class NgramStats:
+	"""Unigram, bigram and trigram statistics over a tokenized corpus, computed with NumPy.
+
+	Tokens are mapped to ids through ``vocab`` (shared across calls if given),
+	each n-gram is packed into one int64 code, and counts, document
+	frequencies and first occurrences come from a single sort per order.
+	Ties in ``top`` are broken by first occurrence, matching
+	``Counter.most_common``.
+	"""
+
+	def __init__(self, tokens_list: Iterable[Sequence[str]], max_n: int = 3, vocab: Optional[Vocabulary] = None):
+		docs = tokens_list if isinstance(tokens_list, list) else list(tokens_list)
+		vocab = vocab if vocab is not None else Vocabulary()
+		lengths = np.fromiter((len(d) for d in docs), dtype=np.int64, count=len(docs))
+		self._setup(vocab, vocab.encode(chain.from_iterable(docs)), lengths, max_n)
+
+	@classmethod
+	def from_ids(cls, vocab: Vocabulary, ids: np.ndarray, lengths: np.ndarray, max_n: int = 3) -> "NgramStats":
+		"""Build from already-encoded tokens: a flat id array and per-document lengths."""
+		stats = cls.__new__(cls)
+		stats._setup(vocab, np.asarray(ids, dtype=np.int32), np.asarray(lengths, dtype=np.int64), max_n)
+		return stats
+
+	def _setup(self, vocab: Vocabulary, ids: np.ndarray, lengths: np.ndarray, max_n: int) -> None:
+		self.vocab = vocab
+		self.max_n = max(1, int(max_n))
+		self.num_docs = int(lengths.size)
+		self.ids = ids
+		self.doc = np.repeat(np.arange(lengths.size, dtype=np.int64), lengths)
+		self._base = max(2, len(self.vocab))
+		if self._base ** self.max_n >= 2 ** 63:
+			raise ValueError(f"Vocabulary of {len(self.vocab)} tokens is too large for {self.max_n}-gram codes")
+		self._stats: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}
+
+	def _order(self, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+		"""(codes, counts, document frequencies, first positions) for order ``n``, sorted by code."""
+		if not 1 <= n <= self.max_n:
+			raise ValueError(f"n must be between 1 and {self.max_n}")
+		if n not in self._stats:
+			codes, positions = _codes(self.ids, self.doc, n, self._base)
+			if codes.size == 0:
+				empty = np.zeros(0, dtype=np.int64)
+				self._stats[n] = (empty, empty, empty, empty)
+				return self._stats[n]
+			# A stable sort keeps positions (and so documents) ascending within each
+			# group, so first occurrence and document frequency fall out of one pass.
+			order = np.argsort(codes, kind="stable")
+			codes, positions = codes[order], positions[order]
+			boundary = np.empty(codes.size, dtype=bool)
+			boundary[0] = True
+			np.not_equal(codes[1:], codes[:-1], out=boundary[1:])
+			starts = np.flatnonzero(boundary)
+			counts = np.diff(np.append(starts, codes.size))
+			docs = self.doc[positions]
+			new_doc = boundary.copy()
+			new_doc[1:] |= docs[1:] != docs[:-1]
+			df = np.add.reduceat(new_doc.astype(np.int64), starts)
+			self._stats[n] = (codes[starts], counts, df, positions[starts])
+		return self._stats[n]
+
+	def _decode(self, code: int, n: int) -> str:
+		parts = []
+		for _ in range(n):
+			code, i = divmod(int(code), self._base)
+			parts.append(self.vocab.token(i))
+		return " ".join(reversed(parts))
+
+	def _top_by(self, n: int, scores: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> List[int]:
+		codes, _, _, first = self._order(n)
+		candidates = np.arange(codes.size) if mask is None else np.flatnonzero(mask)
+		if k <= 0 or candidates.size == 0:
+			return []
+		if candidates.size > k:
+			# Partial selection first, then order just the top-k slice
+			part = np.argpartition(-scores[candidates], k - 1)
+			cut = scores[candidates[part[k - 1]]]
+			candidates = candidates[scores[candidates] >= cut]
+		ranked = candidates[np.lexsort((first[candidates], -scores[candidates]))]
+		return ranked[:k].tolist()
+
+	def counts(self, n: int = 1) -> Dict[str, int]:
+		codes, counts, _, _ = self._order(n)
+		return {self._decode(c, n): int(v) for c, v in zip(codes, counts)}
+
+	def top(self, n: int = 1, k: int = 25) -> List[Tuple[str, int]]:
+		"""Most frequent n-grams as ("w1 w2", count) pairs."""
+		codes, counts, _, _ = self._order(n)
+		return [(self._decode(codes[i], n), int(counts[i])) for i in self._top_by(n, counts, k)]
+
+	def top_pmi(self, n: int = 2, k: int = 20, min_count: int = 3) -> List[Tuple[str, float]]:
+		"""Phrases ranked by pointwise mutual information, log p(w1..wn) / (p(w1)...p(wn)).
+
+		``min_count`` filters rare n-grams, whose PMI is unreliably high.
+		"""
+		if n < 2:
+			raise ValueError("PMI needs n >= 2")
+		codes, counts, _, _ = self._order(n)
+		if codes.size == 0:
+			return []
+		uni_codes, uni_counts, _, _ = self._order(1)
+		uni = np.zeros(self._base, dtype=np.float64)
+		uni[uni_codes] = uni_counts
+		total_uni = max(1.0, float(uni_counts.sum()))
+		total_n = max(1.0, float(counts.sum()))
+		score = np.log(counts / total_n)
+		rest = codes.copy()
+		for _ in range(n):
+			rest, i = np.divmod(rest, self._base)
+			score -= np.log(uni[i] / total_uni)
+		top = self._top_by(n, score, k, mask=counts >= min_count)
+		return [(self._decode(codes[i], n), float(score[i])) for i in top]
+
+	def top_tfidf(self, n: int = 2, k: int = 20, min_df: int = 1) -> List[Tuple[str, float]]:
+		"""Phrases ranked by corpus term frequency times smoothed inverse document frequency."""
+		codes, counts, df, _ = self._order(n)
+		if codes.size == 0:
+			return []
+		score = counts * (np.log((1.0 + self.num_docs) / (1.0 + df)) + 1.0)
+		top = self._top_by(n, score, k, mask=df >= min_df)
+		return [(self._decode(codes[i], n), float(score[i])) for i in top]
+
+
+def top_ngrams(tokens_list: Iterable[Sequence[str]], n: int = 1, top_k: int = 25) -> List[Tuple[str, int]]:
+	return NgramStats(tokens_list, max_n=n).top(n, top_k)
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-import re
-from collections import Counter
-from typing import Dict, Iterable, List, Tuple
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
 
-import nltk
-import spacy
+from .registry import get_spacy
+
+if TYPE_CHECKING:
+	import spacy
+
+	from .corpus import TokenCorpus
 
 
 _NLTK_RESOURCES = [
@@ -14,29 +16,38 @@ _NLTK_RESOURCES = [
 ]
 
 
+_NLTK_READY = False
+
+
 def _ensure_nltk():
+	# Runs on first use of the NLP stage rather than at import, since it may download
+	global _NLTK_READY
+	if _NLTK_READY:
+		return
+	import nltk
+
+	from .bundle import _missing, nltk_dir, offline
+
+	bundled = nltk_dir()
+	if bundled and bundled not in nltk.data.path:
+		nltk.data.path.insert(0, bundled)
 	for resource, path in _NLTK_RESOURCES:
 		try:
 			nltk.data.find(path)
 		except LookupError:
+			if offline():
+				raise _missing(f"NLTK resource {resource!r} is not available offline")
 			nltk.download(resource, quiet=True)
-_ensure_nltk()
+	_NLTK_READY = True
 
 
 def load_spacy_model() -> spacy.language.Language:
-	try:
-		return spacy.load("en_core_web_sm", disable=["parser", "textcat"])
-	except OSError:
-		from spacy.cli import download
-		download("en_core_web_sm")
-		return spacy.load("en_core_web_sm", disable=["parser", "textcat"])
+	_ensure_nltk()
+	# Loaded once per process and shared through the model registry
+	return get_spacy(disable=("parser", "textcat"))
 
 
-def clean_and_lemmatize(text: str, nlp: spacy.language.Language) -> Tuple[str, List[str]]:
-	text = text.strip()
-	if not text:
-		return "", []
-	doc = nlp(text)
+def lemmas_from_doc(doc) -> List[str]:
 	lemmas: List[str] = []
 	for token in doc:
 		if token.is_stop or token.is_punct or not token.is_alpha:
@@ -45,34 +56,40 @@ def clean_and_lemmatize(text: str, nlp: spacy.language.Language) -> Tuple[str, L
 		if not lemma:
 			continue
 		lemmas.append(lemma)
+	return lemmas
+
+
+def clean_and_lemmatize(text: str, nlp: spacy.language.Language) -> Tuple[str, List[str]]:
+	text = text.strip()
+	if not text:
+		return "", []
+	lemmas = lemmas_from_doc(nlp(text))
 	clean_text = " ".join(lemmas)
 	return clean_text, lemmas
 
 
-def preprocess_texts(texts: Iterable[str]) -> List[Dict]:
-	nlp = load_spacy_model()
-	results: List[Dict] = []
-	for t in texts:
-		clean_text, tokens = clean_and_lemmatize(t if isinstance(t, str) else str(t), nlp)
-		results.append({"raw": t, "clean": clean_text, "tokens": tokens})
-	return results
+def preprocess_texts(texts: Iterable[str], batch_size: Optional[int] = None, n_process: Optional[int] = None) -> "TokenCorpus":
+	"""Cleaned text and lemmas per input, as a compact ``TokenCorpus``.
+
+	Each item is a read-only ``{"raw", "clean", "tokens"}`` mapping decoded
+	lazily from the corpus' int32 token ids.
+	"""
+	# Thin view over the single-pass spaCy stage
+	from .analysis import iter_analyze_texts
+	from .corpus import TokenCorpus
+
+	return TokenCorpus.from_analyses(iter_analyze_texts(texts, batch_size=batch_size, n_process=n_process))
 
 
 def compute_top_frequencies(tokens_list: Iterable[List[str]], top_k: int = 25) -> List[Tuple[str, int]]:
-	counter: Counter = Counter()
-	for tokens in tokens_list:
-		counter.update(tokens)
-	return counter.most_common(top_k)
+	from .ngrams import NgramStats
+
+	return NgramStats(tokens_list, max_n=1).top(1, top_k)
 
 
 def compute_top_bigrams(tokens_list: Iterable[List[str]], top_k: int = 20) -> List[Tuple[str, int]]:
 	"""Compute the most common bigrams across all token lists.
 	Returns list of ("word1 word2", count)."""
-	counter: Counter = Counter()
-	for tokens in tokens_list:
-		for i in range(len(tokens) - 1):
-			w1, w2 = tokens[i], tokens[i + 1]
-			if not w1 or not w2:
-				continue
-			counter.update([f"{w1} {w2}"])
-	return counter.most_common(top_k)
+	from .ngrams import NgramStats
+
+	return NgramStats(tokens_list, max_n=2).top(2, top_k)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict
+
+from .config import AppConfig
+
+
+class RateLimitExceeded(Exception):
+	def __init__(self, message: str, retry_after: float | None = None):
+		super().__init__(message)
+		self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None, default: float) -> float:
+	"""Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+	if not value:
+		return default
+	value = value.strip()
+	try:
+		return max(0.0, float(value))
+	except ValueError:
+		pass
+	try:
+		when = parsedate_to_datetime(value)
+	except (TypeError, ValueError):
+		return default
+	if when.tzinfo is None:
+		when = when.replace(tzinfo=timezone.utc)
+	return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _today() -> str:
+	return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class TokenBucket:
+	"""Token bucket plus daily quota persisted in sqlite.
+
+	State lives in a small sqlite file so every thread and every process on the
+	host draws from the same bucket. Each ``acquire`` runs in a ``BEGIN
+	IMMEDIATE`` transaction, which serialises writers across processes.
+	``note_retry_after`` blocks the bucket until the server says it may be used
+	again, so nobody keeps hammering the API after a 429.
+	"""
+
+	def __init__(self, path: str, name: str, rate: float, capacity: float, daily_limit: int = 0):
+		self.path = path
+		self.name = name
+		self.rate = max(1e-6, float(rate))
+		self.capacity = max(1.0, float(capacity))
+		self.daily_limit = max(0, int(daily_limit))
+		self._lock = threading.Lock()
+		with self._connect() as conn:
+			conn.execute(
+				"CREATE TABLE IF NOT EXISTS buckets ("
+				"name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, "
+				"blocked_until REAL NOT NULL DEFAULT 0, day TEXT NOT NULL DEFAULT '', used INTEGER NOT NULL DEFAULT 0)"
+			)
+			conn.execute(
+				"INSERT OR IGNORE INTO buckets (name, tokens, updated, day) VALUES (?, ?, ?, ?)",
+				(self.name, self.capacity, time.time(), _today()),
+			)
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+	def _try_take(self) -> float:
+		"""Take one token if possible; return 0 on success or the seconds to wait."""
+		with self._lock:
+			conn = self._connect()
+			try:
+				conn.execute("BEGIN IMMEDIATE")
+				tokens, updated, blocked_until, day, used = conn.execute(
+					"SELECT tokens, updated, blocked_until, day, used FROM buckets WHERE name = ?", (self.name,)
+				).fetchone()
+				now = time.time()
+				today = _today()
+				if day != today:
+					day, used = today, 0
+				tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+				wait = 0.0
+				if blocked_until > now:
+					wait = blocked_until - now
+				elif self.daily_limit and used >= self.daily_limit:
+					conn.execute("ROLLBACK")
+					raise RateLimitExceeded("Daily request budget exhausted", retry_after=_seconds_until_midnight())
+				elif tokens >= 1.0:
+					tokens -= 1.0
+					used += 1
+				else:
+					wait = (1.0 - tokens) / self.rate
+				conn.execute(
+					"UPDATE buckets SET tokens = ?, updated = ?, day = ?, used = ? WHERE name = ?",
+					(tokens, now, day, used, self.name),
+				)
+				conn.execute("COMMIT")
+				return wait
+			finally:
+				conn.close()
+
+	def acquire(self, timeout: float = 0.0) -> None:
+		"""Take a token, waiting at most ``timeout`` seconds; raise if that is not enough."""
+		deadline = time.monotonic() + max(0.0, timeout)
+		while True:
+			wait = self._try_take()
+			if wait <= 0:
+				return
+			remaining = deadline - time.monotonic()
+			if wait > remaining:
+				raise RateLimitExceeded("Request rate limit reached", retry_after=wait)
+			time.sleep(wait)
+
+	def note_retry_after(self, seconds: float) -> None:
+		until = time.time() + max(0.0, seconds)
+		with self._lock, self._connect() as conn:
+			conn.execute(
+				"UPDATE buckets SET blocked_until = MAX(blocked_until, ?), tokens = 0 WHERE name = ?",
+				(until, self.name),
+			)
+
+	def status(self) -> Dict[str, float]:
+		with self._lock, self._connect() as conn:
+			tokens, updated, blocked_until, day, used = conn.execute(
+				"SELECT tokens, updated, blocked_until, day, used FROM buckets WHERE name = ?", (self.name,)
+			).fetchone()
+		now = time.time()
+		if day != _today():
+			used = 0
+		return {
+			"daily_limit": self.daily_limit,
+			"used_today": used,
+			"remaining_today": max(0, self.daily_limit - used) if self.daily_limit else float("inf"),
+			"tokens": min(self.capacity, tokens + max(0.0, now - updated) * self.rate),
+			"blocked_for": max(0.0, blocked_until - now),
+		}
+
+
+def _seconds_until_midnight() -> float:
+	now = datetime.now(timezone.utc)
+	tomorrow = datetime(now.year, now.month, now.day, tzinfo=timezone.utc).timestamp() + 86400
+	return max(0.0, tomorrow - now.timestamp())
+
+
+_BUCKETS: Dict[str, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def get_gnews_bucket() -> TokenBucket:
+	with _BUCKETS_LOCK:
+		bucket = _BUCKETS.get("gnews")
+		if bucket is None:
+			cfg = AppConfig()
+			bucket = _BUCKETS["gnews"] = TokenBucket(
+				cfg.rate_limit_path,
+				"gnews",
+				rate=cfg.gnews_requests_per_second,
+				capacity=cfg.gnews_burst,
+				daily_limit=cfg.gnews_daily_quota,
+			)
+		return bucket
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from .config import AppConfig
+
+
+class ModelStats:
+	__slots__ = ("loads", "hits", "load_seconds", "last_load_seconds")
+
+	def __init__(self):
+		self.loads = 0
+		self.hits = 0
+		self.load_seconds = 0.0
+		self.last_load_seconds = 0.0
+
+	def as_dict(self) -> Dict[str, float]:
+		return {f: getattr(self, f) for f in self.__slots__}
+
+
+class ModelRegistry:
+	"""Process-wide, thread-safe cache of loaded models.
+
+	Each key is loaded at most once; concurrent first requests for the same key
+	wait on a per-key lock instead of loading twice. Load time and hit counts
+	are recorded per key.
+	"""
+
+	def __init__(self):
+		self._models: Dict[Hashable, Any] = {}
+		self._stats: Dict[Hashable, ModelStats] = {}
+		self._locks: Dict[Hashable, threading.Lock] = {}
+		self._lock = threading.Lock()
+
+	def _key_lock(self, key: Hashable) -> threading.Lock:
+		with self._lock:
+			lock = self._locks.get(key)
+			if lock is None:
+				lock = self._locks[key] = threading.Lock()
+			self._stats.setdefault(key, ModelStats())
+			return lock
+
+	def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+		with self._lock:
+			if key in self._models:
+				self._stats[key].hits += 1
+				return self._models[key]
+		with self._key_lock(key):
+			with self._lock:
+				if key in self._models:
+					self._stats[key].hits += 1
+					return self._models[key]
+			start = time.perf_counter()
+			model = loader()
+			elapsed = time.perf_counter() - start
+			with self._lock:
+				self._models[key] = model
+				stats = self._stats[key]
+				stats.loads += 1
+				stats.load_seconds += elapsed
+				stats.last_load_seconds = elapsed
+			return model
+
+	def is_loaded(self, key: Hashable) -> bool:
+		with self._lock:
+			return key in self._models
+
+	def evict(self, key: Optional[Hashable] = None, kind: Optional[str] = None) -> int:
+		"""Drop one key, every key of a ``kind`` (first tuple element), or everything."""
+		with self._lock:
+			if key is not None:
+				doomed = [key] if key in self._models else []
+			elif kind is not None:
+				doomed = [k for k in self._models if isinstance(k, tuple) and k and k[0] == kind]
+			else:
+				doomed = list(self._models)
+			for k in doomed:
+				del self._models[k]
+			return len(doomed)
+
+	def stats(self) -> Dict[str, Dict[str, float]]:
+		with self._lock:
+			return {
+				_format_key(k): dict(s.as_dict(), loaded=k in self._models)
+				for k, s in self._stats.items()
+			}
+
+
+def _format_key(key: Hashable) -> str:
+	if isinstance(key, tuple):
+		return ":".join(str(p) if not isinstance(p, tuple) else ",".join(map(str, p)) or "-" for p in key)
+	return str(key)
+
+
+_REGISTRY = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+	return _REGISTRY
+
+
+def spacy_key(name: str, disable: Sequence[str] = ()) -> Tuple:
+	return ("spacy", name, tuple(sorted(set(disable))))
+
+
+def _load_spacy_package(name: str, disable: Tuple[str, ...]):
+	import spacy
+
+	try:
+		return spacy.load(name, disable=list(disable))
+	except OSError:
+		from spacy.cli import download
+		download(name)
+		return spacy.load(name, disable=list(disable))
+
+
+def _load_spacy(name: str, disable: Tuple[str, ...]):
+	from .bundle import spacy_path
+
+	# Raises instead of returning None when OFFLINE_MODELS is set and the model is not bundled
+	path = spacy_path(name)
+	if path is None:
+		return _load_spacy_package(name, disable)
+	import spacy
+
+	return spacy.load(path, disable=list(disable))
+
+
+def get_spacy(name: Optional[str] = None, disable: Sequence[str] = ()):
+	name = name or AppConfig().spacy_model
+	key = spacy_key(name, disable)
+	return _REGISTRY.get(key, lambda: _load_spacy(name, key[2]))
+
+
+_WARMUP_THREAD: threading.Thread | None = None
+_WARMUP_LOCK = threading.Lock()
+
+
+def warmup_models(names: Optional[Iterable[str]] = None, background: bool = False) -> Optional[threading.Thread]:
+	"""Eagerly load models so the first request does not pay for it.
+
+	``names`` defaults to ``WARMUP_MODELS`` (comma-separated: ``spacy``,
+	``sentiment``, ``ner_hf``). With ``background`` the loads run in a daemon
+	thread and the thread is returned.
+	"""
+	global _WARMUP_THREAD
+	if names is None:
+		names = [n.strip() for n in AppConfig().warmup_models.split(",") if n.strip()]
+	names = list(names)
+	if not names:
+		return None
+
+	def run():
+		for name in names:
+			try:
+				if name == "spacy":
+					from .preprocessing import load_spacy_model
+					load_spacy_model()
+				elif name == "sentiment":
+					from .sentiment import get_sentiment_pipeline
+					get_sentiment_pipeline()
+				elif name == "ner_hf":
+					from .ner import get_hf_ner
+					get_hf_ner()
+			except Exception:
+				if not background:
+					raise
+
+	if background:
+		with _WARMUP_LOCK:
+			# Streamlit re-executes the app script on every interaction; warm up once.
+			if _WARMUP_THREAD is None:
+				_WARMUP_THREAD = threading.Thread(target=run, name="model-warmup", daemon=True)
+				_WARMUP_THREAD.start()
+			return _WARMUP_THREAD
+	run()
+	return None
+
+
+def loaded_models() -> List[str]:
+	return [k for k, s in _REGISTRY.stats().items() if s["loaded"]]
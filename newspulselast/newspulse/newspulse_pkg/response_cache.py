@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Mapping, Optional
+
+from .config import AppConfig
+from .http_client import cache_key
+
+
+_KEY_LOCK_STRIPES = 64
+
+
+class _Entry:
+	__slots__ = ("payload", "stored_at")
+
+	def __init__(self, payload: bytes, stored_at: float):
+		self.payload = payload
+		self.stored_at = stored_at
+
+
+class ResponseCache:
+	"""Process-wide LRU cache of raw response bodies with stale-while-revalidate.
+
+	Keys are built from the endpoint URL and the request params with the API
+	token removed, so every user shares the same entry. Within ``ttl`` an entry
+	is served as-is; within ``ttl + stale_ttl`` it is served immediately while a
+	background thread refreshes it; after that the caller fetches synchronously.
+	The last good body is kept until evicted and is returned when a fetch fails
+	with an error accepted by ``is_transient`` (rate limit, 5xx, network).
+	"""
+
+	def __init__(
+		self,
+		max_entries: int = 256,
+		ttls: Optional[Mapping[str, float]] = None,
+		default_ttl: float = 300.0,
+		stale_ttl: float = 1800.0,
+		path: str | None = None,
+	):
+		self.max_entries = max(1, int(max_entries))
+		self.ttls: Dict[str, float] = dict(ttls or {})
+		self.default_ttl = float(default_ttl)
+		self.stale_ttl = float(stale_ttl)
+		self.path = path or None
+		self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+		self._lock = threading.Lock()
+		self._key_locks = [threading.Lock() for _ in range(_KEY_LOCK_STRIPES)]
+		self._refreshing: set = set()
+		self.stats: Dict[str, int] = {"fresh": 0, "stale": 0, "miss": 0, "fallback": 0, "refresh_errors": 0}
+		if self.path:
+			with self._connect() as conn:
+				conn.execute(
+					"CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, payload BLOB NOT NULL)"
+				)
+
+	# -- storage -----------------------------------------------------------
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.path, timeout=5)
+
+	def _get(self, key: str) -> _Entry | None:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None:
+				self._entries.move_to_end(key)
+				return entry
+		if not self.path:
+			return None
+		with self._connect() as conn:
+			row = conn.execute("SELECT payload, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+		if row is None:
+			return None
+		entry = _Entry(bytes(row[0]), float(row[1]))
+		self._put_memory(key, entry)
+		return entry
+
+	def _put_memory(self, key: str, entry: _Entry) -> None:
+		with self._lock:
+			self._entries[key] = entry
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def _put(self, key: str, payload: bytes) -> None:
+		entry = _Entry(payload, time.time())
+		self._put_memory(key, entry)
+		if not self.path:
+			return
+		with self._connect() as conn:
+			conn.execute(
+				"INSERT OR REPLACE INTO responses (key, stored_at, payload) VALUES (?, ?, ?)",
+				(key, entry.stored_at, payload),
+			)
+			conn.execute(
+				"DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY stored_at DESC LIMIT ?)",
+				(self.max_entries,),
+			)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+		if self.path:
+			with self._connect() as conn:
+				conn.execute("DELETE FROM responses")
+
+	# -- lookup ------------------------------------------------------------
+
+	def ttl_for(self, endpoint: str) -> float:
+		name = endpoint.rstrip("/").rsplit("/", 1)[-1]
+		return self.ttls.get(name, self.default_ttl)
+
+	def _key_lock(self, key: str) -> threading.Lock:
+		# Striped: a fixed pool, so distinct queries don't grow a lock per key
+		return self._key_locks[hash(key) % _KEY_LOCK_STRIPES]
+
+	def _count(self, name: str) -> None:
+		with self._lock:
+			self.stats[name] += 1
+
+	def _refresh_in_background(self, key: str, fetch: Callable[[], bytes]) -> None:
+		with self._lock:
+			if key in self._refreshing:
+				return
+			self._refreshing.add(key)
+
+		def run():
+			try:
+				self._put(key, fetch())
+			except Exception:
+				self._count("refresh_errors")
+			finally:
+				with self._lock:
+					self._refreshing.discard(key)
+
+		threading.Thread(target=run, name="response-cache-refresh", daemon=True).start()
+
+	def get_or_fetch(
+		self,
+		endpoint: str,
+		params: Optional[Mapping],
+		fetch: Callable[[], bytes],
+		is_transient: Callable[[Exception], bool] = lambda exc: False,
+	) -> bytes:
+		key = json.dumps(cache_key(endpoint, params))
+		ttl = self.ttl_for(endpoint)
+		entry = self._get(key)
+		if entry is not None:
+			age = time.time() - entry.stored_at
+			if age <= ttl:
+				self._count("fresh")
+				return entry.payload
+			if age <= ttl + self.stale_ttl:
+				self._count("stale")
+				self._refresh_in_background(key, fetch)
+				return entry.payload
+		# Coalesce concurrent misses for the same key into one upstream call.
+		with self._key_lock(key):
+			current = self._get(key)
+			if current is not None and current is not entry and time.time() - current.stored_at <= ttl:
+				self._count("fresh")
+				return current.payload
+			self._count("miss")
+			try:
+				payload = fetch()
+			except Exception as exc:
+				if current is not None and is_transient(exc):
+					self._count("fallback")
+					return current.payload
+				raise
+			self._put(key, payload)
+			return payload
+
+
+_CACHE: ResponseCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+	global _CACHE
+	if _CACHE is None:
+		with _CACHE_LOCK:
+			if _CACHE is None:
+				cfg = AppConfig()
+				_CACHE = ResponseCache(
+					max_entries=cfg.response_cache_max_entries,
+					ttls={"top-headlines": cfg.response_cache_ttl_headlines, "search": cfg.response_cache_ttl_search},
+					stale_ttl=cfg.response_cache_stale_ttl,
+					path=cfg.response_cache_path or None,
+				)
+	return _CACHE
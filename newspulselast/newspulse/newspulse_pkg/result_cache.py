@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import orjson
+
+from .config import AppConfig
+
+
+# Bump whenever analysis output for the same text and model would change
+# (token filtering, entity labels, label normalization, ...).
+PIPELINE_VERSION = "2"
+
+
+def result_key(kind: str, model: str, text: str) -> str:
+	"""Content address of one analysis result: hash of (kind, model, pipeline version, text).
+
+	Text is hashed verbatim so cached entity offsets always refer to the
+	exact string that was analyzed.
+	"""
+	h = hashlib.blake2b(digest_size=20)
+	for part in (kind, model, PIPELINE_VERSION):
+		h.update(part.encode("utf-8"))
+		h.update(b"\0")
+	h.update(text.encode("utf-8", errors="surrogatepass"))
+	return h.hexdigest()
+
+
+class AnalysisCache:
+	"""Two-tier cache for per-text analysis results.
+
+	An in-memory LRU holds decoded values; an optional sqlite file persists
+	them across processes and restarts. Disk entries carry a last-access time
+	and the oldest are evicted once ``max_disk_items`` is exceeded. Cached
+	values are shared between callers and must be treated as read-only.
+	"""
+
+	def __init__(self, path: str | None = None, max_memory_items: int = 20_000, max_disk_items: int = 500_000):
+		self.path = path or None
+		self.max_memory_items = max(1, int(max_memory_items))
+		self.max_disk_items = max(1, int(max_disk_items))
+		self._memory: "OrderedDict[str, Any]" = OrderedDict()
+		self._lock = threading.Lock()
+		self._writes_since_trim = 0
+		self.stats: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+		if self.path:
+			os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+			with self._connect() as conn:
+				conn.execute("PRAGMA journal_mode=WAL")
+				conn.execute(
+					"CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed REAL NOT NULL)"
+				)
+				conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.path, timeout=10)
+
+	def _remember(self, key: str, value: Any) -> None:
+		self._memory[key] = value
+		self._memory.move_to_end(key)
+		while len(self._memory) > self.max_memory_items:
+			self._memory.popitem(last=False)
+
+	def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+		found: Dict[str, Any] = {}
+		with self._lock:
+			for key in keys:
+				if key in self._memory:
+					self._memory.move_to_end(key)
+					found[key] = self._memory[key]
+			self.stats["memory_hits"] += len(found)
+		missing = [k for k in dict.fromkeys(keys) if k not in found]
+		if missing and self.path:
+			rows = []
+			with self._connect() as conn:
+				for i in range(0, len(missing), 500):
+					chunk = missing[i : i + 500]
+					marks = ",".join("?" * len(chunk))
+					rows.extend(conn.execute(f"SELECT key, value FROM results WHERE key IN ({marks})", chunk).fetchall())
+				if rows:
+					now = time.time()
+					conn.executemany("UPDATE results SET accessed = ? WHERE key = ?", [(now, k) for k, _ in rows])
+			with self._lock:
+				for key, blob in rows:
+					value = orjson.loads(blob)
+					found[key] = value
+					self._remember(key, value)
+				self.stats["disk_hits"] += len(rows)
+		with self._lock:
+			self.stats["misses"] += len(set(keys) - found.keys())
+		return found
+
+	def put_many(self, items: Dict[str, Any]) -> None:
+		if not items:
+			return
+		with self._lock:
+			for key, value in items.items():
+				self._remember(key, value)
+		if not self.path:
+			return
+		now = time.time()
+		with self._connect() as conn:
+			conn.executemany(
+				"INSERT OR REPLACE INTO results (key, value, accessed) VALUES (?, ?, ?)",
+				[(k, orjson.dumps(v), now) for k, v in items.items()],
+			)
+			with self._lock:
+				self._writes_since_trim += len(items)
+				trim = self._writes_since_trim >= max(100, self.max_disk_items // 100)
+				if trim:
+					self._writes_since_trim = 0
+			if trim:
+				conn.execute(
+					"DELETE FROM results WHERE key IN ("
+					"SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+					(self.max_disk_items,),
+				)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._memory.clear()
+		if self.path:
+			with self._connect() as conn:
+				conn.execute("DELETE FROM results")
+
+
+def cached_map(
+	kind: str,
+	model: str,
+	texts: Sequence[str],
+	compute: Callable[[List[str]], List[Any]],
+	cache: Optional[AnalysisCache] = None,
+) -> List[Any]:
+	"""Return ``compute``'s result for every text, computing only cache misses.
+
+	Misses (deduplicated) are passed to ``compute`` as one batch, so callers
+	keep their batching behaviour for the part that is actually new.
+	"""
+	if not texts:
+		return []
+	cache = cache or get_analysis_cache()
+	keys = [result_key(kind, model, t) for t in texts]
+	found = cache.get_many(keys)
+	todo: Dict[str, str] = {}
+	for key, text in zip(keys, texts):
+		if key not in found and key not in todo:
+			todo[key] = text
+	if todo:
+		computed = compute(list(todo.values()))
+		fresh = dict(zip(todo.keys(), computed))
+		cache.put_many(fresh)
+		found.update(fresh)
+	return [found[k] for k in keys]
+
+
+_CACHE: AnalysisCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+	global _CACHE
+	if _CACHE is None:
+		with _CACHE_LOCK:
+			if _CACHE is None:
+				cfg = AppConfig()
+				try:
+					_CACHE = AnalysisCache(
+						cfg.analysis_cache_path or None,
+						max_memory_items=cfg.analysis_cache_memory_items,
+						max_disk_items=cfg.analysis_cache_disk_items,
+					)
+				except (OSError, sqlite3.Error):
+					# Unwritable cache location: keep the memory tier only
+					_CACHE = AnalysisCache(None, max_memory_items=cfg.analysis_cache_memory_items)
+	return _CACHE
@@ -1,55 +1,165 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-from transformers import AutoModelForSequenceClassification, AutoTokenizer, TextClassificationPipeline
+import numpy as np
 
+from .backends import check_backend, load_sequence_classifier, model_id
 from .config import AppConfig
+from .registry import get_registry
+from .result_cache import cached_map
 
+if TYPE_CHECKING:
+	from transformers import TextClassificationPipeline
 
-_PIPELINE: TextClassificationPipeline | None = None
-_MODEL_NAME: str | None = None
+	from .inference import SequenceClassifierEngine
 
 
-def get_sentiment_pipeline(model_name: Optional[str] = None) -> TextClassificationPipeline:
-	global _PIPELINE, _MODEL_NAME
+def _load_sentiment_pipeline(model_name: str, backend: str = "torch") -> TextClassificationPipeline:
+	from transformers import TextClassificationPipeline
+
+	model, tokenizer = load_sequence_classifier(model_name, backend)
+	return TextClassificationPipeline(model=model, tokenizer=tokenizer, return_all_scores=False)
+
+
+def get_sentiment_pipeline(model_name: Optional[str] = None, backend: Optional[str] = None) -> TextClassificationPipeline:
 	requested = model_name or AppConfig().sentiment_model
-	if _PIPELINE is not None and _MODEL_NAME == requested:
-		return _PIPELINE
-	tokenizer = AutoTokenizer.from_pretrained(requested)
-	model = AutoModelForSequenceClassification.from_pretrained(requested)
-	_PIPELINE = TextClassificationPipeline(model=model, tokenizer=tokenizer, return_all_scores=False)
-	_MODEL_NAME = requested
-	return _PIPELINE
-
-
-def predict_sentiment(texts: List[str], model_name: Optional[str] = None) -> List[Dict]:
-	pipeline = get_sentiment_pipeline(model_name)
-	outputs = pipeline(texts, truncation=True, padding=True, max_length=512)
-	# normalize labels
+	backend = check_backend(backend or AppConfig().sentiment_backend)
+	return get_registry().get(("sentiment", requested, backend), lambda: _load_sentiment_pipeline(requested, backend))
+
+
+def predict_sentiment(texts: List[str], model_name: Optional[str] = None, backend: Optional[str] = None) -> List[Dict]:
+	cfg = AppConfig()
+	requested = model_name or cfg.sentiment_model
+	backend = check_backend(backend or cfg.sentiment_backend)
+	# Content-addressed cache: only texts never scored by this model are run.
+	# The truncation length changes the scores, so it is part of the key.
+	cached = cached_map(
+		f"sentiment:{cfg.sentiment_max_length}",
+		model_id(requested, backend),
+		list(texts),
+		lambda misses: _predict_uncached(misses, requested, backend),
+	)
+	return [dict(r) for r in cached]
+
+
+DOC_WEIGHTINGS = ("length", "mean", "max")
+
+
+def predict_document_sentiment(
+	texts: List[str],
+	model_name: Optional[str] = None,
+	backend: Optional[str] = None,
+	weighting: Optional[str] = None,
+	stride: Optional[int] = None,
+) -> List[Dict]:
+	"""Sentiment of whole documents, however long.
+
+	Texts longer than the model window are split into overlapping windows;
+	windows from all documents are scored together in shared batches and
+	combined per document by ``weighting``: ``length`` (token-weighted mean of
+	the window probabilities), ``mean`` (plain mean) or ``max`` (the most
+	confident window decides). Each result has ``label`` and ``score`` like
+	``predict_sentiment`` plus ``windows`` with per-window ``start``/``end``
+	character offsets, ``label`` and ``score``.
+	"""
+	cfg = AppConfig()
+	requested = model_name or cfg.sentiment_model
+	backend = check_backend(backend or cfg.sentiment_backend)
+	weighting = (weighting or cfg.sentiment_doc_weighting).lower()
+	if weighting not in DOC_WEIGHTINGS:
+		raise ValueError(f"Unknown weighting {weighting!r}; expected one of {', '.join(DOC_WEIGHTINGS)}")
+	stride = cfg.sentiment_window_stride if stride is None else int(stride)
+	kind = f"sentiment-doc:{weighting}:{cfg.sentiment_max_length}:{stride}"
+	cached = cached_map(
+		kind,
+		model_id(requested, backend),
+		list(texts),
+		lambda misses: _predict_documents_uncached(misses, requested, backend, weighting, stride),
+	)
+	return [dict(r, windows=[dict(w) for w in r["windows"]]) for r in cached]
+
+
+def _predict_documents_uncached(texts: List[str], model_name: str, backend: str, weighting: str, stride: int) -> List[Dict]:
+	engine = get_sentiment_engine(model_name, backend)
+	input_ids, owners, spans = engine.tokenize_windows(texts, stride=stride)
+	probs = engine.predict_proba_ids(input_ids)
+	names = [normalize_sentiment_label(engine.label_name(i), model_name) for i in range(probs.shape[-1])]
+	lengths = np.fromiter((len(ids) for ids in input_ids), dtype=np.float64, count=len(input_ids))
+	# Windows come grouped by text in input order, so each text owns one contiguous slice
+	bounds = np.searchsorted(np.asarray(owners, dtype=np.int64), np.arange(len(texts) + 1))
+
 	results: List[Dict] = []
-	for out in outputs:
-		raw_label = str(out["label"]).lower()
-		label = raw_label
-		if raw_label in {"positive", "pos"}:
-			label = "positive"
-		elif raw_label in {"negative", "neg"}:
-			label = "negative"
-		elif raw_label in {"neutral", "neu"}:
-			label = "neutral"
-		elif raw_label.startswith("label_"):
-			# Map indices for common models
-			try:
-				idx = int(raw_label.split("_")[-1])
-			except Exception:
-				idx = -1
-			active_model = (model_name or AppConfig().sentiment_model).lower()
-			if "cardiffnlp/twitter-roberta-base-sentiment" in active_model:
-				mapping = {0: "negative", 1: "neutral", 2: "positive"}
-			else:
-				mapping = {0: "negative", 1: "positive"}
-			label = mapping.get(idx, "neutral")
-		score = float(out["score"]) if isinstance(out, dict) else float(out.score)
-		results.append({"label": label, "score": score})
+	for doc in range(len(texts)):
+		rows = np.arange(bounds[doc], bounds[doc + 1])
+		window_probs = probs[rows]
+		best = window_probs.argmax(axis=-1)
+		windows = [
+			{"start": int(spans[r][0]), "end": int(spans[r][1]), "label": names[b], "score": float(window_probs[k, b])}
+			for k, (r, b) in enumerate(zip(rows, best))
+		]
+		if weighting == "max":
+			combined = window_probs[int(window_probs.max(axis=-1).argmax())]
+		else:
+			weights = lengths[rows] if weighting == "length" else np.ones(len(rows))
+			combined = (window_probs * weights[:, None]).sum(axis=0) / weights.sum()
+		top = int(combined.argmax())
+		results.append({"label": names[top], "score": float(combined[top]), "windows": windows})
 	return results
 
+
+def get_sentiment_engine(model_name: Optional[str] = None, backend: Optional[str] = None) -> SequenceClassifierEngine:
+	requested = model_name or AppConfig().sentiment_model
+	backend = check_backend(backend or AppConfig().sentiment_backend)
+
+	def build() -> SequenceClassifierEngine:
+		from .inference import SequenceClassifierEngine, configure_torch_threads
+
+		cfg = AppConfig()
+		configure_torch_threads()
+		pipeline = get_sentiment_pipeline(requested, backend)
+		return SequenceClassifierEngine(
+			pipeline.model,
+			pipeline.tokenizer,
+			batch_size=cfg.sentiment_batch_size,
+			max_length=cfg.sentiment_max_length,
+		)
+
+	return get_registry().get(("sentiment-engine", requested, backend), build)
+
+
+def sentiment_stats(model_name: Optional[str] = None, backend: Optional[str] = None) -> Dict[str, float]:
+	"""Throughput of the last ``predict_sentiment`` batch (texts, tokens, tokens/sec)."""
+	return get_sentiment_engine(model_name, backend).last_stats.as_dict()
+
+
+def normalize_sentiment_label(raw_label: str, model_name: Optional[str] = None) -> str:
+	raw_label = str(raw_label).lower()
+	label = raw_label
+	if raw_label in {"positive", "pos"}:
+		label = "positive"
+	elif raw_label in {"negative", "neg"}:
+		label = "negative"
+	elif raw_label in {"neutral", "neu"}:
+		label = "neutral"
+	elif raw_label.startswith("label_"):
+		# Map indices for common models
+		try:
+			idx = int(raw_label.split("_")[-1])
+		except Exception:
+			idx = -1
+		active_model = (model_name or AppConfig().sentiment_model).lower()
+		if "cardiffnlp/twitter-roberta-base-sentiment" in active_model:
+			mapping = {0: "negative", 1: "neutral", 2: "positive"}
+		else:
+			mapping = {0: "negative", 1: "positive"}
+		label = mapping.get(idx, "neutral")
+	return label
+
+
+def _predict_uncached(texts: List[str], model_name: Optional[str] = None, backend: Optional[str] = None) -> List[Dict]:
+	outputs = get_sentiment_engine(model_name, backend).predict(texts)
+	return [
+		{"label": normalize_sentiment_label(out["label"], model_name), "score": float(out["score"])}
+		for out in outputs
+	]
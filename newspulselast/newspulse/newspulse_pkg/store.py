@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import orjson
+
+from .articles import Article
+from .config import AppConfig
+from .dedup import normalize_url
+
+
+def article_key(article) -> int:
+	"""Signed 64-bit hash of the article's normalized URL (or id/title)."""
+	ident = normalize_url(article.get("url") or "") or (article.get("id") or article.get("title") or "")
+	return int.from_bytes(hashlib.blake2b(ident.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+class SeenSet:
+	"""Membership set of 64-bit keys stored in a sorted int64 array (8 bytes per key).
+
+	New keys go to a small pending set that is merged into the array once it
+	grows past ``merge_every``, so inserts stay cheap and lookups are a binary
+	search.
+	"""
+
+	def __init__(self, keys: Iterable[int] = (), merge_every: int = 4096):
+		self._keys = np.unique(np.fromiter(keys, dtype=np.int64))
+		self._pending: set = set()
+		self.merge_every = max(1, merge_every)
+
+	def __len__(self) -> int:
+		return int(self._keys.size) + len(self._pending)
+
+	def __contains__(self, key: int) -> bool:
+		if key in self._pending:
+			return True
+		i = int(np.searchsorted(self._keys, key))
+		return i < self._keys.size and int(self._keys[i]) == key
+
+	def add(self, key: int) -> bool:
+		"""Add ``key``; return False if it was already present."""
+		if key in self:
+			return False
+		self._pending.add(key)
+		if len(self._pending) >= self.merge_every:
+			self._merge()
+		return True
+
+	def _merge(self) -> None:
+		pending = np.fromiter(self._pending, dtype=np.int64, count=len(self._pending))
+		self._keys = np.union1d(self._keys, pending)
+		self._pending.clear()
+
+
+class ArticleStore:
+	"""Append-only local article store (sqlite) shared by the ingestion daemon and the UI.
+
+	Readers only run queries. The seen-set of article keys, which lets the
+	writer skip known articles without a database round trip, is loaded on
+	the first ``append``. Each ``append`` also records when its category was
+	last polled, so readers can tell fresh data from a stopped daemon's.
+	"""
+
+	def __init__(self, path: str):
+		self.path = path
+		self._lock = threading.Lock()
+		self._seen: Optional[SeenSet] = None
+		with self._connect() as conn:
+			conn.execute("PRAGMA journal_mode=WAL")
+			conn.execute(
+				"CREATE TABLE IF NOT EXISTS articles ("
+				"id INTEGER PRIMARY KEY AUTOINCREMENT, key INTEGER NOT NULL UNIQUE, category TEXT NOT NULL, fetched_at REAL NOT NULL, payload BLOB NOT NULL)"
+			)
+			conn.execute("CREATE INDEX IF NOT EXISTS articles_category_time ON articles (category, fetched_at)")
+			conn.execute("CREATE TABLE IF NOT EXISTS polls (category TEXT PRIMARY KEY, polled_at REAL NOT NULL)")
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.path, timeout=10)
+
+	def __len__(self) -> int:
+		with self._connect() as conn:
+			return int(conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0])
+
+	def _seen_set(self) -> SeenSet:
+		# Called with self._lock held
+		if self._seen is None:
+			with self._connect() as conn:
+				self._seen = SeenSet(row[0] for row in conn.execute("SELECT key FROM articles"))
+		return self._seen
+
+	def append(self, category: str, articles: Iterable) -> int:
+		"""Store articles not seen before and mark ``category`` as polled; return how many were new."""
+		now = time.time()
+		rows = []
+		with self._lock:
+			seen = self._seen_set()
+			for a in articles:
+				key = article_key(a)
+				if not seen.add(key):
+					continue
+				data = a.to_dict() if isinstance(a, Article) else dict(a)
+				rows.append((key, category, now, orjson.dumps(data)))
+		with self._connect() as conn:
+			conn.execute(
+				"INSERT INTO polls (category, polled_at) VALUES (?, ?) ON CONFLICT(category) DO UPDATE SET polled_at = excluded.polled_at",
+				(category, now),
+			)
+			before = conn.total_changes
+			conn.executemany(
+				"INSERT OR IGNORE INTO articles (key, category, fetched_at, payload) VALUES (?, ?, ?, ?)", rows
+			)
+			return conn.total_changes - before
+
+	def polled_at(self, categories: Sequence[str]) -> Dict[str, float]:
+		"""When each of ``categories`` was last polled (epoch seconds); never-polled ones are absent."""
+		categories = list(categories)
+		if not categories:
+			return {}
+		with self._connect() as conn:
+			rows = conn.execute(
+				f"SELECT category, polled_at FROM polls WHERE category IN ({', '.join('?' * len(categories))})",
+				categories,
+			).fetchall()
+		return {cat: float(at) for cat, at in rows}
+
+	def latest(self, category: str, limit: int = 20) -> List[Article]:
+		with self._connect() as conn:
+			rows = conn.execute(
+				"SELECT payload FROM articles WHERE category = ? ORDER BY fetched_at DESC, id ASC LIMIT ?",
+				(category, max(0, int(limit))),
+			).fetchall()
+		return [Article.from_dict(orjson.loads(row[0])) for row in rows]
+
+	def latest_by_category(self, categories: Sequence[str], limit: int = 20) -> Dict[str, List[Article]]:
+		return {cat: self.latest(cat, limit) for cat in categories}
+
+
+_STORE: ArticleStore | None = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_article_store() -> Optional[ArticleStore]:
+	"""The configured store, or None when ``ARTICLE_STORE_PATH`` is not set."""
+	global _STORE
+	path = AppConfig().article_store_path
+	if not path:
+		return None
+	with _STORE_LOCK:
+		if _STORE is None or _STORE.path != path:
+			_STORE = ArticleStore(path)
+		return _STORE
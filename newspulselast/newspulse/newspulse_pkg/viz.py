@@ -1,17 +1,31 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, List
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Tuple, Union
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
-import plotly.express as px
+from .batch import AnalysisBatch
+
+if TYPE_CHECKING:
+	import pandas as pd
+
+# Plotting libraries are imported inside each chart function: they dominate
+# import time and are only needed once a chart is actually drawn.
+
+
+def _sentiment_batch(sentiments) -> AnalysisBatch:
+	return sentiments if isinstance(sentiments, AnalysisBatch) else AnalysisBatch.from_results(sentiments=sentiments)
+
+
+def _entity_batch(entities_lists) -> AnalysisBatch:
+	return entities_lists if isinstance(entities_lists, AnalysisBatch) else AnalysisBatch.from_results(entities=entities_lists)
 
 
 def plot_word_frequencies(freq_pairs: List[tuple[str, int]]):
 	if not freq_pairs:
 		return None
 	words, counts = zip(*freq_pairs)
+	import matplotlib.pyplot as plt
+	import seaborn as sns
+
 	plt.figure(figsize=(10, 5))
 	sns.barplot(x=list(words), y=list(counts), color="#4C78A8")
 	plt.xticks(rotation=45, ha="right")
@@ -22,12 +36,16 @@ def plot_word_frequencies(freq_pairs: List[tuple[str, int]]):
 	return plt.gcf()
 
 
-def sentiment_distribution_chart(sentiments: List[Dict]):
-	if not sentiments:
+def sentiment_distribution_chart(sentiments: Union[List[Dict], AnalysisBatch]):
+	counts = _sentiment_batch(sentiments).sentiment_counts() if sentiments else []
+	if not counts:
 		return None
-	df = pd.DataFrame(sentiments)
+	labels, values = zip(*counts)
+	import matplotlib.pyplot as plt
+	import seaborn as sns
+
 	plt.figure(figsize=(6, 4))
-	sns.countplot(x="label", data=df, hue="label", legend=False, palette="Set2")
+	sns.barplot(x=list(labels), y=list(values), hue=list(labels), legend=False, palette="Set2")
 	plt.title("Sentiment Distribution")
 	plt.xlabel("Label")
 	plt.ylabel("Count")
@@ -35,22 +53,17 @@ def sentiment_distribution_chart(sentiments: List[Dict]):
 	return plt.gcf()
 
 
-def entities_count_table(entities_lists: List[List[Dict]]) -> pd.DataFrame:
-	rows: List[Dict] = []
-	for ents in entities_lists:
-		for e in ents:
-			rows.append({"entity": e.get("text"), "label": e.get("label")})
-	df = pd.DataFrame(rows)
-	if df.empty:
-		return pd.DataFrame(columns=["label", "entity", "count"])  # empty
-	counts = df.groupby(["label", "entity"]).size().reset_index(name="count").sort_values("count", ascending=False)
-	return counts
+def entities_count_table(entities_lists: Union[List[List[Dict]], AnalysisBatch]) -> pd.DataFrame:
+	return _entity_batch(entities_lists).entity_counts()
 
 
 def plotly_word_frequencies(freq_pairs: List[tuple[str, int]]):
 	if not freq_pairs:
 		return None
 	words, counts = zip(*freq_pairs)
+	import pandas as pd
+	import plotly.express as px
+
 	df = pd.DataFrame({"word": list(words), "count": list(counts)})
 	fig = px.bar(
 		df, x="word", y="count", title="Top Word Frequencies",
@@ -60,12 +73,19 @@ def plotly_word_frequencies(freq_pairs: List[tuple[str, int]]):
 	return fig
 
 
-def plotly_sentiment_distribution(sentiments: List[Dict]):
-	if not sentiments:
+def plotly_sentiment_distribution(sentiments: Union[List[Dict], AnalysisBatch]):
+	return plotly_sentiment_counts(_sentiment_batch(sentiments).sentiment_counts() if sentiments else [])
+
+
+def plotly_sentiment_counts(counts: Sequence[Tuple[str, int]]):
+	if not counts:
 		return None
-	df = pd.DataFrame(sentiments)
-	counts = df.groupby("label").size().reset_index(name="count")
-	fig = px.pie(counts, values="count", names="label", title="Sentiment Distribution",
+	labels, values = zip(*counts)
+	import pandas as pd
+	import plotly.express as px
+
+	df = pd.DataFrame({"label": list(labels), "count": list(values)})
+	fig = px.pie(df, values="count", names="label", title="Sentiment Distribution",
 			hole=0.35, template="plotly_white")
 	fig.update_traces(textposition="inside", textinfo="percent+label")
 	return fig
@@ -75,20 +95,26 @@ def plotly_bigrams(bigrams: List[tuple[str, int]]):
 	if not bigrams:
 		return None
 	phrases, counts = zip(*bigrams)
+	import pandas as pd
+	import plotly.express as px
+
 	df = pd.DataFrame({"bigram": list(phrases), "count": list(counts)})
 	fig = px.bar(df, x="bigram", y="count", title="Top Bigrams", labels={"bigram": "Bigram", "count": "Frequency"}, template="plotly_white")
 	fig.update_layout(xaxis_tickangle=-45)
 	return fig
 
 
-def plotly_entity_labels(entities_lists: List[List[Dict]]):
-	rows: List[Dict] = []
-	for ents in entities_lists:
-		for e in ents:
-			rows.append({"label": e.get("label")})
-	df = pd.DataFrame(rows)
-	if df.empty:
+def plotly_entity_labels(entities_lists: Union[List[List[Dict]], AnalysisBatch]):
+	return plotly_entity_label_counts(_entity_batch(entities_lists).entity_label_counts())
+
+
+def plotly_entity_label_counts(counts: Sequence[Tuple[str, int]]):
+	if not counts:
 		return None
-	counts = df.groupby("label").size().reset_index(name="count")
-	fig = px.bar(counts, x="label", y="count", title="Entity Labels", template="plotly_white")
+	labels, values = zip(*counts)
+	import pandas as pd
+	import plotly.express as px
+
+	df = pd.DataFrame({"label": list(labels), "count": list(values)})
+	fig = px.bar(df, x="label", y="count", title="Entity Labels", template="plotly_white")
 	return fig